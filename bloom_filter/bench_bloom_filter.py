@@ -0,0 +1,52 @@
+"""
+Memory, throughput and false positive rate of the Bloom filter variants.
+
+Run with:
+    python -m bloom_filter.bench_bloom_filter [--items N]
+"""
+
+import argparse
+import time
+
+from .blocked_bloom_filter import BlockedBloomFilter
+from .bloom_filter import BloomFilter
+from .counting_bloom_filter import CountingBloomFilter
+
+
+def _storage_bytes(bf: BloomFilter) -> int:
+    storage = bf._counters if isinstance(bf, CountingBloomFilter) else bf._bit_words
+    return memoryview(storage).nbytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    n = args.items
+
+    print(
+        f"{'variant':<22} {'bits/slot':>10} {'MiB':>8} {'add/s':>12} "
+        f"{'lookup ns':>10} {'fpr':>8}"
+    )
+    for cls in (BloomFilter, BlockedBloomFilter, CountingBloomFilter):
+        bf = cls(expected_items=n, false_pos_rate=0.01)
+
+        start = time.perf_counter()
+        bf.add_many(f"user:{i}" for i in range(n))
+        add_rate = n / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        false_pos = sum(bf.contains_many(f"absent:{i}" for i in range(n)))
+        lookup_ns = (time.perf_counter() - start) / n * 1e9
+
+        size = _storage_bytes(bf)
+        print(
+            f"{cls.__name__:<22} {size * 8 / bf._bit_array_size:>10.2f}"
+            f" {size / 2**20:>8.1f} {add_rate:>12,.0f} {lookup_ns:>10,.0f}"
+            f" {false_pos / n:>8.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from .bloom_filter import BloomFilter
+
+BLOCK_BITS = 512  # one 64-byte cache line
+_WORDS_PER_BLOCK = BLOCK_BITS // 64
+
+
+class BlockedBloomFilter(BloomFilter):
+    """
+    Cache-blocked Bloom filter.
+
+    The bit array is split into 512-bit blocks, each the size of a cache line.
+    The first base hash picks one block per key and all k bits for that key are set
+    inside it, so `add` and `contains` touch a single cache line instead of k random
+    words spread across the whole array.
+
+    Confining the bits to one block makes the load per block uneven, so the false
+    positive rate is slightly higher than a classic filter of the same size. The
+    bit array is rounded up to a whole number of blocks.
+
+    Based on "Cache-, Hash- and Space-Efficient Bloom Filters", Putze, Sanders
+    and Singler (https://algo2.iti.kit.edu/documents/cacheefficientbloomfilters-jea.pdf).
+    """
+
+    _MAGIC = b"BBLF"
+
+    def _calculate_optimal_size(self, capacity: int, false_pos_rate: float) -> int:
+        """
+        Calculate the optimal bit array size (m), rounded up to whole blocks.
+
+        Args:
+            capacity (int): The expected number of elements to store (n).
+            false_pos_rate (float): The desired false positive probability (p).
+
+        Returns:
+            int: The bit array size (m), a multiple of the block size.
+        """
+        size = super()._calculate_optimal_size(capacity, false_pos_rate)
+        return -(-size // BLOCK_BITS) * BLOCK_BITS
+
+    def _indexes(self, hash_1: int, hash_2: int) -> list[int]:
+        """Combine an item's two base hashes into k bit indexes, all within one block.
+
+        hash1 selects the block. The low bits of hash2 give an offset and an odd
+        step inside the block, and the k indexes are offset + i * step (mod 512).
+        An odd step is coprime with 512, so the k indexes are distinct.
+
+        Args:
+            hash_1 (int): The first base hash.
+            hash_2 (int): The second base hash.
+
+        Returns:
+            list[int]: A list of k bit indexes.
+        """
+        mask = BLOCK_BITS - 1
+        base = (hash_1 % (self._bit_array_size // BLOCK_BITS)) * BLOCK_BITS
+        offset = hash_2 & mask
+        step = ((hash_2 >> 9) & mask) | 1
+        return [base + ((offset + i * step) & mask) for i in range(self._num_hash_fns)]
@@ -1,5 +1,21 @@
+import array
 import hashlib
+import itertools
 import math
+import mmap as _mmap
+import os
+import struct
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Self
+
+from hashing.hashers import Hasher, get_hasher
+
+# On-disk layout: a fixed little-endian header, the hasher name (empty for the
+# default md5 + sha256 pair), zero padding to an 8-byte boundary, then the raw
+# filter storage (for BloomFilter, the bit array as little-endian uint64 words).
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHHQdQI")  # magic, version, name len, n, p, m, k
 
 
 class BloomFilter:
@@ -12,16 +28,27 @@ class BloomFilter:
     number of items and the desired false positive rate.
     """
 
-    def __init__(self, expected_items: int = 1_000, false_pos_rate: float = 0.01):
+    _MAGIC = b"BLMF"
+
+    def __init__(
+        self,
+        expected_items: int = 1_000,
+        false_pos_rate: float = 0.01,
+        hasher: str | Hasher | None = None,
+    ):
         """
         Initializes a BloomFilter object.
 
         Args:
             expected_items (int): The expected number of items to be stored in the filter.
             false_pos_rate (float): The desired false positive rate.
+            hasher (str | Hasher | None): The hash backend to use. None keeps the
+                original md5 + sha256 pair; any other backend is hashed once per key
+                and its digest is split into the two base hashes.
         """
         self._expected_items = expected_items
         self._false_pos_rate = false_pos_rate
+        self._hasher = None if hasher is None else get_hasher(hasher)
 
         self._bit_array_size = self._calculate_optimal_size(
             expected_items, false_pos_rate
@@ -31,7 +58,8 @@ class BloomFilter:
         )
 
         self._num_words = (self._bit_array_size + 63) // 64  # round up
-        self._bit_words = [0] * self._num_words
+        self._allocate_storage()
+        self._mmap = None
 
     def _set_bit(self, bit_index: int) -> None:
         """
@@ -70,9 +98,9 @@ class BloomFilter:
         Returns:
             bool: True if the element is likely in the set, False if it is definitely not.
         """
-        hash_vals = self._hash(key)
-        for h in hash_vals:
-            if not self._get_bit(h):
+        words = self._bit_words
+        for h in self._hash(key):
+            if not (words[h >> 6] >> (h & 63)) & 1:
                 return False
         return True
 
@@ -83,9 +111,394 @@ class BloomFilter:
         Args:
             key (str): The key to add.
         """
-        hash_vals = self._hash(key)
-        for h in hash_vals:
-            self._set_bit(h)
+        words = self._bit_words
+        for h in self._hash(key):
+            words[h >> 6] |= 1 << (h & 63)
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        """
+        Adds many elements to the bloom filter in a single pass.
+
+        Produces exactly the same bits as calling `add` once per key. On
+        little-endian hosts the bits are set through a byte view of the word array,
+        which is cheaper per bit than updating uint64 words.
+
+        Args:
+            keys (Iterable[str]): The keys to add.
+        """
+        if sys.byteorder == "little":
+            # bit i is bit i % 8 of byte i // 8, and single bytes are much cheaper to
+            # update than uint64 words, which convert to and from large ints
+            with memoryview(self._bit_words) as view, view.cast("B") as bits:
+                self._set_bits(keys, bits, 3, 7)
+        else:
+            self._set_bits(keys, self._bit_words, 6, 63)
+
+    def _set_bits(self, keys: Iterable[str], cells, shift: int, mask: int) -> None:
+        """Set each key's bits in cells of mask + 1 bits, bit i in cell i >> shift."""
+        for hash_vals in self._hash_many(keys):
+            for h in hash_vals:
+                cells[h >> shift] |= 1 << (h & mask)
+
+    def contains_many(self, keys: Iterable[str]) -> list[bool]:
+        """
+        Checks many elements against the bloom filter in a single pass.
+
+        Args:
+            keys (Iterable[str]): The keys to check for.
+
+        Returns:
+            list[bool]: One result per key, in order, identical to calling `contains`.
+        """
+        if sys.byteorder == "little":
+            with memoryview(self._bit_words) as view, view.cast("B") as bits:
+                return self._test_bits(keys, bits, 3, 7)
+        return self._test_bits(keys, self._bit_words, 6, 63)
+
+    def _test_bits(
+        self, keys: Iterable[str], cells, shift: int, mask: int
+    ) -> list[bool]:
+        """Test each key's bits in cells of mask + 1 bits, bit i in cell i >> shift."""
+        results = []
+        for hash_vals in self._hash_many(keys):
+            for h in hash_vals:
+                if not (cells[h >> shift] >> (h & mask)) & 1:
+                    results.append(False)
+                    break
+            else:
+                results.append(True)
+        return results
+
+    @property
+    def fill_ratio(self) -> float:
+        """The fraction of bits in the bit array that are set."""
+        return self._count_set_bits() / self._bit_array_size
+
+    @property
+    def estimated_fpr(self) -> float:
+        """
+        The false positive rate implied by the current fill ratio.
+
+        A lookup for an absent key is a false positive when all k probed bits are set,
+        which for a fill ratio X happens with probability X^k.
+        """
+        return self.fill_ratio**self._num_hash_fns
+
+    def _count_set_bits(self) -> int:
+        """Counts the set bits in the bit array with a single popcount."""
+        return int.from_bytes(memoryview(self._bit_words), "little").bit_count()
+
+    def estimated_cardinality(self) -> float:
+        """
+        Estimates the number of distinct items added, from the number of set bits.
+
+        Uses the estimate of Swamidass and Baldi:
+            n* = -(m / k) * ln(1 - X / m)
+        where X is the number of set bits.
+
+        Returns:
+            float: The estimated number of items, or math.inf if every bit is set.
+        """
+        set_bits = self._count_set_bits()
+        if set_bits >= self._bit_array_size:
+            return math.inf
+        m = self._bit_array_size
+        return -(m / self._num_hash_fns) * math.log(1 - set_bits / m)
+
+    def union(self, other: Self) -> Self:
+        """
+        Returns a new filter containing every key in either filter.
+
+        The result is identical to a filter that had every key of both filters
+        added to it. Both filters must have the same m, k and hasher.
+
+        Args:
+            other (BloomFilter): The filter to combine with.
+
+        Returns:
+            BloomFilter: The union of the two filters.
+        """
+        return self._combine(other, self._union_storage)
+
+    def intersection(self, other: Self) -> Self:
+        """
+        Returns a new filter containing every key present in both filters.
+
+        Bits set by different keys in each filter can survive the AND, so the result
+        has at least the false positive rate of a filter built from the intersection
+        and its `estimated_cardinality` tends to overestimate.
+        Both filters must have the same m, k and hasher.
+
+        Args:
+            other (BloomFilter): The filter to combine with.
+
+        Returns:
+            BloomFilter: The intersection of the two filters.
+        """
+        return self._combine(other, self._intersection_storage)
+
+    def __or__(self, other: Self) -> Self:
+        if not isinstance(other, BloomFilter):
+            return NotImplemented
+        return self.union(other)
+
+    def __and__(self, other: Self) -> Self:
+        if not isinstance(other, BloomFilter):
+            return NotImplemented
+        return self.intersection(other)
+
+    def __ior__(self, other: Self) -> Self:
+        if not isinstance(other, BloomFilter):
+            return NotImplemented
+        self._check_compatible(other)
+        data = self._union_storage(other)
+        # a mapped filter is unmapped and holds the union in memory from now on
+        self.close()
+        self._load_storage(memoryview(data), True)
+        return self
+
+    def _combine(self, other: Self, storage_op) -> Self:
+        """Builds a new filter whose storage is `storage_op(other)`."""
+        self._check_compatible(other)
+        result = type(self)._without_storage(
+            self._expected_items,
+            self._false_pos_rate,
+            self._hasher,
+            self._bit_array_size,
+            self._num_hash_fns,
+        )
+        result._load_storage(memoryview(storage_op(other)), True)
+        return result
+
+    def _check_compatible(self, other: Self) -> None:
+        if type(self) is not type(other):
+            raise ValueError(
+                f"cannot combine {type(self).__name__} with {type(other).__name__}"
+            )
+        self_hasher = self._hasher.name if self._hasher is not None else None
+        other_hasher = other._hasher.name if other._hasher is not None else None
+        if (
+            self._bit_array_size != other._bit_array_size
+            or self._num_hash_fns != other._num_hash_fns
+            or self_hasher != other_hasher
+        ):
+            raise ValueError("filters must share the same size, hash count and hasher")
+
+    def _union_storage(self, other: Self) -> bytes:
+        """The serialized storage of the union: both filters' bits ORed."""
+        return self._bitwise(other, int.__or__)
+
+    def _intersection_storage(self, other: Self) -> bytes:
+        """The serialized storage of the intersection: both filters' bits ANDed."""
+        return self._bitwise(other, int.__and__)
+
+    def _bitwise(self, other: Self, op) -> bytes:
+        # the storage is little-endian, so bit i of the int is bit i of the filter
+        value = op(
+            int.from_bytes(self._storage_to_bytes(), "little"),
+            int.from_bytes(other._storage_to_bytes(), "little"),
+        )
+        return value.to_bytes(self._storage_size(), "little")
+
+    @classmethod
+    def build_parallel(
+        cls,
+        keys: Iterable[str],
+        workers: int | None = None,
+        expected_items: int = 1_000,
+        false_pos_rate: float = 0.01,
+        hasher: str | Hasher | None = None,
+        chunk_size: int = 100_000,
+    ) -> Self:
+        """
+        Builds a filter from many keys using a pool of worker processes.
+
+        The keys are split into chunks of `chunk_size`. Each worker builds a shard
+        filter from one chunk and the shards are ORed together. The result is
+        identical to adding every key to a single filter. At most two chunks per
+        worker are in flight at a time, so `keys` can be a lazy stream.
+
+        Args:
+            keys (Iterable[str]): The keys to add.
+            workers (int | None): The number of processes, defaulting to the CPU count.
+            expected_items (int): The expected number of items in the final filter.
+            false_pos_rate (float): The desired false positive rate.
+            hasher (str | Hasher | None): The hash backend to use.
+            chunk_size (int): The number of keys sent to a worker at a time.
+
+        Returns:
+            BloomFilter: The filter containing every key.
+        """
+        workers = workers or os.cpu_count() or 1
+        result = cls(expected_items, false_pos_rate, hasher)
+        params = (expected_items, false_pos_rate, hasher)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            max_pending = 2 * workers
+            pending = set()
+            for chunk in _chunked(keys, chunk_size):
+                pending.add(executor.submit(_build_shard, cls, params, chunk))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result |= cls.from_bytes(future.result())
+            for future in pending:
+                result |= cls.from_bytes(future.result())
+
+        return result
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the filter to a compact header followed by the raw bit array.
+
+        Returns:
+            bytes: The serialized filter, readable by `from_bytes` and `open`.
+        """
+        return self._header() + self._storage_to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Self:
+        """
+        Deserializes a filter produced by `to_bytes` or `save`.
+
+        Args:
+            data (bytes): The serialized filter.
+
+        Returns:
+            BloomFilter: A new, writable filter holding a copy of the bit array.
+        """
+        bf, offset = cls._from_header(data)
+        bf._load_storage(memoryview(data)[offset : offset + bf._storage_size()], True)
+        return bf
+
+    def save(self, path: str) -> None:
+        """
+        Writes the filter to a file in the `to_bytes` format.
+
+        Args:
+            path (str): The destination file path.
+        """
+        with open(path, "wb") as f:
+            f.write(self._header())
+            f.write(self._storage_to_bytes())
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True) -> Self:
+        """
+        Loads a filter written by `save`.
+
+        With `mmap=True` the bit array is not read into memory: `contains` reads
+        bits straight out of a read-only memory map of the file, so many processes
+        can share one copy of a large filter through the page cache. A mapped filter
+        cannot be added to; call `close` to release the mapping.
+
+        Args:
+            path (str): The file to load.
+            mmap (bool): Whether to memory-map the file instead of copying it.
+
+        Returns:
+            BloomFilter: The loaded filter.
+        """
+        with open(path, "rb") as f:
+            if not mmap or sys.byteorder == "big":
+                return cls.from_bytes(f.read())
+            mapped = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+
+        try:
+            bf, offset = cls._from_header(mapped)
+        except ValueError:
+            mapped.close()
+            raise
+        end = offset + bf._storage_size()
+        bf._load_storage(memoryview(mapped)[offset:end], False)
+        bf._mmap = mapped
+        return bf
+
+    def close(self) -> None:
+        """Releases the memory map of a filter loaded with `open(..., mmap=True)`."""
+        if self._mmap is not None:
+            self._release_storage()
+            self._mmap.close()
+            self._mmap = None
+
+    def _header(self) -> bytes:
+        name = b"" if self._hasher is None else self._hasher.name.encode("utf-8")
+        header = _HEADER.pack(
+            self._MAGIC,
+            _FORMAT_VERSION,
+            len(name),
+            self._expected_items,
+            self._false_pos_rate,
+            self._bit_array_size,
+            self._num_hash_fns,
+        )
+        header += name
+        return header + bytes(-len(header) % 8)
+
+    def _allocate_storage(self) -> None:
+        self._bit_words = array.array("Q", bytes(8 * self._num_words))  # uint64 words
+
+    def _storage_size(self) -> int:
+        """The serialized size of the bit array, in bytes."""
+        return 8 * self._num_words
+
+    def _storage_to_bytes(self) -> bytes:
+        if sys.byteorder == "big":
+            words = array.array("Q", self._bit_words)
+            words.byteswap()
+            return words.tobytes()
+        return memoryview(self._bit_words).tobytes()
+
+    def _load_storage(self, buffer: memoryview, copy: bool) -> None:
+        """Attaches a serialized bit array, either copied or as a view of `buffer`."""
+        if copy:
+            words = array.array("Q")
+            words.frombytes(buffer)
+            if sys.byteorder == "big":
+                words.byteswap()
+            self._bit_words = words
+        else:
+            self._bit_words = buffer.cast("Q")
+
+    def _release_storage(self) -> None:
+        self._bit_words.release()
+        self._bit_words = None
+
+    @classmethod
+    def _from_header(cls, data) -> tuple[Self, int]:
+        """Builds a filter without storage from a serialized header and returns it
+        with the offset of the storage."""
+        if len(data) < _HEADER.size:
+            raise ValueError(f"data is too short to be a serialized {cls.__name__}")
+        magic, version, name_len, n, p, m, k = _HEADER.unpack_from(data)
+        if magic != cls._MAGIC:
+            raise ValueError(f"data is not a serialized {cls.__name__}")
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"unsupported {cls.__name__} format version {version}")
+
+        name = bytes(data[_HEADER.size : _HEADER.size + name_len]).decode("utf-8")
+        offset = _HEADER.size + name_len
+        offset += -offset % 8
+
+        bf = cls._without_storage(n, p, get_hasher(name) if name else None, m, k)
+        if len(data) < offset + bf._storage_size():
+            raise ValueError(f"data is too short for the {cls.__name__} storage")
+        return bf, offset
+
+    @classmethod
+    def _without_storage(
+        cls, n: int, p: float, hasher: Hasher | None, m: int, k: int
+    ) -> Self:
+        """Builds a filter with the given parameters whose storage is not yet attached."""
+        bf = cls.__new__(cls)
+        bf._expected_items = n
+        bf._false_pos_rate = p
+        bf._hasher = hasher
+        bf._bit_array_size = m
+        bf._num_hash_fns = k
+        bf._num_words = (m + 63) // 64
+        bf._mmap = None
+        return bf
 
     def _calculate_optimal_size(self, capacity: int, false_pos_rate: float) -> int:
         """
@@ -149,16 +562,67 @@ class BloomFilter:
         Returns:
             list[int]: A list of k hash values.
         """
-        encoded_item = item
         if isinstance(item, str):
-            encoded_item = item.encode("utf-8")
+            item = item.encode("utf-8")
+        if self._hasher is None:
+            return self._indexes(*_md5_sha256(item))
+        return self._indexes(*self._hasher.hash_pair(item))
+
+    def _hash_many(self, items: Iterable[str]) -> Iterator[list[int]]:
+        """Generate the k hash values of `_hash` for each of many items.
+
+        Args:
+            items (Iterable[str]): The items to hash.
+
+        Yields:
+            list[int]: A list of k hash values per item.
+        """
+        hash_pair = self._hash_pair()
+        indexes = self._indexes
+        for item in items:
+            if isinstance(item, str):
+                item = item.encode("utf-8")
+            yield indexes(*hash_pair(item))
+
+    def _indexes(self, hash_1: int, hash_2: int) -> list[int]:
+        """Combine an item's two base hashes into its k bit indexes.
+
+        Both hashes are reduced modulo m before combining, which yields the same
+        indexes as reducing (hash1 + i * hash2) but keeps the arithmetic on small ints.
+
+        Args:
+            hash_1 (int): The first base hash.
+            hash_2 (int): The second base hash.
+
+        Returns:
+            list[int]: A list of k hash values.
+        """
+        size = self._bit_array_size
+        hash_1 %= size
+        hash_2 %= size
+        return [(hash_1 + i * hash_2) % size for i in range(self._num_hash_fns)]
+
+    def _hash_pair(self) -> Callable[[bytes], tuple[int, int]]:
+        """The function giving the two base hashes of an encoded item."""
+        return self._hasher.hash_pair if self._hasher is not None else _md5_sha256
+
+
+def _md5_sha256(data: bytes) -> tuple[int, int]:
+    """The default base hashes: md5 and sha256 digests, as big-endian ints."""
+    return (
+        int.from_bytes(hashlib.md5(data).digest(), "big"),
+        int.from_bytes(hashlib.sha256(data).digest(), "big"),
+    )
+
+
+def _build_shard(cls: type[BloomFilter], params: tuple, keys: list[str]) -> bytes:
+    """Worker for `BloomFilter.build_parallel`: builds one shard and serializes it."""
+    shard = cls(*params)
+    shard.add_many(keys)
+    return shard.to_bytes()
 
-        # two hash fns
-        hash_1 = int(hashlib.md5(encoded_item).hexdigest(), 16)
-        hash_2 = int(hashlib.sha256(encoded_item).hexdigest(), 16)
 
-        hashes = []
-        for i in range(self._num_hash_fns):
-            h = (hash_1 + i * hash_2) % self._bit_array_size
-            hashes.append(h)
-        return hashes
+def _chunked(items: Iterable[str], size: int) -> Iterator[list[str]]:
+    it = iter(items)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
@@ -0,0 +1,223 @@
+from typing import Iterable
+
+from .bloom_filter import BloomFilter
+
+# number of non-zero 4-bit counters in each possible byte
+_NONZERO_COUNTERS = bytes(((b & 0x0F) != 0) + ((b >> 4) != 0) for b in range(256))
+
+
+class CountingBloomFilter(BloomFilter):
+    """
+    Bloom filter that supports removing keys.
+
+    Each of the m slots holds a 4-bit counter instead of a single bit. Adding a key
+    increments its k counters and removing it decrements them, so a slot reads as set
+    while any key mapped to it is still present.
+
+    Counters are packed two per byte in a `bytearray`, so the filter takes 4 bits
+    per slot: (m + 1) // 2 bytes, four times the m / 8 bytes of a `BloomFilter` with
+    the same m and k. Counters saturate at 15. A saturated counter is never
+    decremented, because its true count is unknown; this can leave a slot set
+    forever but never causes a false negative.
+    """
+
+    _MAGIC = b"CBLF"
+    MAX_COUNT = 15
+
+    def _allocate_storage(self) -> None:
+        self._counters = bytearray((self._bit_array_size + 1) // 2)
+
+    def _storage_size(self) -> int:
+        """The serialized size of the counter array, in bytes."""
+        return (self._bit_array_size + 1) // 2
+
+    def _storage_to_bytes(self) -> bytes:
+        return bytes(self._counters)
+
+    def _load_storage(self, buffer: memoryview, copy: bool) -> None:
+        """Attaches serialized counters, either copied or as a view of `buffer`."""
+        self._counters = bytearray(buffer) if copy else buffer
+
+    def _release_storage(self) -> None:
+        self._counters.release()
+        self._counters = None
+
+    def _union_storage(self, other: BloomFilter) -> bytes:
+        """
+        Adds the two filters' counters slot by slot, saturating at MAX_COUNT.
+
+        Below saturation this equals a filter that had every key of both filters
+        added to it, so a union of shards can still have keys removed.
+        """
+        max_count = self.MAX_COUNT
+        return _combine_counters(
+            self._counters, other._counters, lambda a, b: min(a + b, max_count)
+        )
+
+    def _intersection_storage(self, other: BloomFilter) -> bytes:
+        """Takes the smaller of the two filters' counters in each slot."""
+        return _combine_counters(self._counters, other._counters, min)
+
+    def _count_set_bits(self) -> int:
+        """Counts the slots with a non-zero counter."""
+        return sum(bytes(self._counters).translate(_NONZERO_COUNTERS))
+
+    def _get_count(self, index: int) -> int:
+        """
+        Gets the value of the counter at the given slot.
+
+        Args:
+            index (int): The slot index.
+
+        Returns:
+            int: The counter value, from 0 to MAX_COUNT.
+        """
+        return (self._counters[index >> 1] >> ((index & 1) << 2)) & 0x0F
+
+    def _set_bit(self, bit_index: int) -> None:
+        """
+        Increments the counter at the given slot, saturating at MAX_COUNT.
+
+        Args:
+            bit_index (int): The slot index.
+        """
+        shift = (bit_index & 1) << 2
+        byte = self._counters[bit_index >> 1]
+        if (byte >> shift) & 0x0F < self.MAX_COUNT:
+            self._counters[bit_index >> 1] = byte + (1 << shift)
+
+    def _get_bit(self, bit_index: int) -> bool:
+        """
+        Checks whether the counter at the given slot is non-zero.
+
+        Args:
+            bit_index (int): The slot index.
+
+        Returns:
+            bool: True if the counter is non-zero, False otherwise.
+        """
+        return self._get_count(bit_index) > 0
+
+    def _clear_bit(self, bit_index: int) -> None:
+        """
+        Decrements the counter at the given slot unless it is zero or saturated.
+
+        Args:
+            bit_index (int): The slot index.
+        """
+        shift = (bit_index & 1) << 2
+        byte = self._counters[bit_index >> 1]
+        if 0 < (byte >> shift) & 0x0F < self.MAX_COUNT:
+            self._counters[bit_index >> 1] = byte - (1 << shift)
+
+    def contains(self, key: str) -> bool:
+        """
+        Checks if an element is in the filter.
+
+        Args:
+            key (str): The key to check for.
+
+        Returns:
+            bool: True if the element is likely in the set, False if it is definitely not.
+        """
+        return all(self._get_bit(h) for h in self._hash(key))
+
+    def add(self, key: str) -> None:
+        """
+        Adds an element to the filter.
+
+        Args:
+            key (str): The key to add.
+        """
+        for h in self._hash(key):
+            self._set_bit(h)
+
+    def remove(self, key: str) -> bool:
+        """
+        Removes an element from the filter.
+
+        Only keys that were added should be removed: removing a key that only tests
+        positive because of a false positive decrements counters owned by other
+        keys and can cause false negatives.
+
+        Args:
+            key (str): The key to remove.
+
+        Returns:
+            bool: True if the key appeared to be present and was removed, False otherwise.
+        """
+        hash_vals = self._hash(key)
+        if not all(self._get_bit(h) for h in hash_vals):
+            return False
+        for h in hash_vals:
+            self._clear_bit(h)
+        return True
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        """
+        Adds many elements to the filter in a single pass.
+
+        Args:
+            keys (Iterable[str]): The keys to add.
+        """
+        counters = self._counters
+        max_count = self.MAX_COUNT
+        for hash_vals in self._hash_many(keys):
+            for h in hash_vals:
+                shift = (h & 1) << 2
+                byte = counters[h >> 1]
+                if (byte >> shift) & 0x0F < max_count:
+                    counters[h >> 1] = byte + (1 << shift)
+
+    def contains_many(self, keys: Iterable[str]) -> list[bool]:
+        """
+        Checks many elements against the filter in a single pass.
+
+        Args:
+            keys (Iterable[str]): The keys to check for.
+
+        Returns:
+            list[bool]: One result per key, in order, identical to calling `contains`.
+        """
+        counters = self._counters
+        results = []
+        for hash_vals in self._hash_many(keys):
+            for h in hash_vals:
+                if not (counters[h >> 1] >> ((h & 1) << 2)) & 0x0F:
+                    results.append(False)
+                    break
+            else:
+                results.append(True)
+        return results
+
+    def remove_many(self, keys: Iterable[str]) -> list[bool]:
+        """
+        Removes many elements from the filter in a single pass.
+
+        Args:
+            keys (Iterable[str]): The keys to remove.
+
+        Returns:
+            list[bool]: One result per key, in order, identical to calling `remove`.
+        """
+        counters = self._counters
+        max_count = self.MAX_COUNT
+        results = []
+        for hash_vals in self._hash_many(keys):
+            if not all((counters[h >> 1] >> ((h & 1) << 2)) & 0x0F for h in hash_vals):
+                results.append(False)
+                continue
+            for h in hash_vals:
+                shift = (h & 1) << 2
+                byte = counters[h >> 1]
+                if 0 < (byte >> shift) & 0x0F < max_count:
+                    counters[h >> 1] = byte - (1 << shift)
+            results.append(True)
+        return results
+
+
+def _combine_counters(left, right, op) -> bytes:
+    """Applies op to each pair of 4-bit counters packed in two counter arrays."""
+    return bytes(
+        op(a & 0x0F, b & 0x0F) | op(a >> 4, b >> 4) << 4 for a, b in zip(left, right)
+    )
@@ -0,0 +1,130 @@
+import math
+
+from hashing.hashers import Hasher
+
+from .bloom_filter import BloomFilter
+
+
+class ScalableBloomFilter:
+    """
+    A Bloom filter that grows to hold an unknown number of items.
+
+    Based on "Scalable Bloom Filters", Almeida, Baquero, Preguiça and Hutchison
+    (https://gsd.di.uminho.pt/members/cbm/ps/dbloom.pdf).
+
+    The filter is a chain of `BloomFilter` slices. When the newest slice reaches its
+    capacity a new one is appended, `growth_factor` times larger and with an error
+    rate `tightening_ratio` times smaller. The per-slice error rates form a geometric
+    series, so the compounded false positive rate stays below `false_pos_rate` no
+    matter how many slices are added, and memory grows only with the data.
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int = 1_000,
+        false_pos_rate: float = 0.01,
+        growth_factor: int = 2,
+        tightening_ratio: float = 0.85,
+        hasher: str | Hasher | None = None,
+    ):
+        """
+        Initializes a ScalableBloomFilter object.
+
+        Args:
+            initial_capacity (int): The number of items the first slice holds.
+            false_pos_rate (float): The upper bound on the overall false positive rate.
+            growth_factor (int): How much larger each new slice is than the previous one.
+            tightening_ratio (float): How much smaller each new slice's error rate is.
+            hasher (str | Hasher | None): The hash backend passed to every slice.
+        """
+        if not (isinstance(initial_capacity, int) and initial_capacity > 0):
+            raise ValueError("initial_capacity must be a positive integer")
+        if not 0 < false_pos_rate < 1:
+            raise ValueError("false_pos_rate must be between 0 and 1")
+        if growth_factor < 1:
+            raise ValueError("growth_factor must be at least 1")
+        if not 0 < tightening_ratio < 1:
+            raise ValueError("tightening_ratio must be between 0 and 1")
+
+        self._initial_capacity = initial_capacity
+        self._false_pos_rate = false_pos_rate
+        self._growth_factor = growth_factor
+        self._tightening_ratio = tightening_ratio
+        self._hasher = hasher
+
+        self._slices: list[BloomFilter] = []
+        self._slice_capacities: list[int] = []
+        self._count = 0  # items in the newest slice
+        self._total_count = 0
+        self._add_slice()
+
+    def __len__(self) -> int:
+        """The number of distinct items added (duplicates and false positives excluded)."""
+        return self._total_count
+
+    @property
+    def capacity(self) -> int:
+        """The number of items the current slices can hold before another is added."""
+        return sum(self._slice_capacities)
+
+    @property
+    def fill_ratio(self) -> float:
+        """The fraction of bits set across all slices."""
+        set_bits = sum(s._count_set_bits() for s in self._slices)
+        return set_bits / sum(s._bit_array_size for s in self._slices)
+
+    @property
+    def estimated_fpr(self) -> float:
+        """
+        The false positive rate implied by the current fill of every slice.
+
+        A lookup is a false positive if any slice reports one, so the slice rates
+        compound as 1 - prod(1 - p_i).
+        """
+        return 1 - math.prod(1 - s.estimated_fpr for s in self._slices)
+
+    def contains(self, key: str) -> bool:
+        """
+        Checks if an element is in any slice of the filter.
+
+        Args:
+            key (str): The key to check for.
+
+        Returns:
+            bool: True if the element is likely in the set, False if it is definitely not.
+        """
+        # newest slices are the largest and hold most of the items
+        return any(s.contains(key) for s in reversed(self._slices))
+
+    def add(self, key: str) -> None:
+        """
+        Adds an element to the filter, growing it if the newest slice is full.
+
+        Keys that already appear to be present are not added again, so duplicates
+        do not use up slice capacity.
+
+        Args:
+            key (str): The key to add.
+        """
+        if self.contains(key):
+            return None
+
+        if self._count >= self._slice_capacities[-1]:
+            self._add_slice()
+
+        self._slices[-1].add(key)
+        self._count += 1
+        self._total_count += 1
+
+    def _add_slice(self) -> None:
+        index = len(self._slices)
+        capacity = self._initial_capacity * self._growth_factor**index
+        # P_i = P * (1 - r) * r^i, so the series sums to at most P
+        error_rate = (
+            self._false_pos_rate
+            * (1 - self._tightening_ratio)
+            * self._tightening_ratio**index
+        )
+        self._slices.append(BloomFilter(capacity, error_rate, hasher=self._hasher))
+        self._slice_capacities.append(capacity)
+        self._count = 0
@@ -0,0 +1,57 @@
+from .blocked_bloom_filter import BLOCK_BITS, BlockedBloomFilter
+
+
+def test_empty_filter_contains_nothing():
+    bf = BlockedBloomFilter()
+    assert not bf.contains("foo")
+    assert not bf.contains("")
+
+
+def test_contains_gets_added_item():
+    bf = BlockedBloomFilter()
+    bf.add("foo")
+    assert bf.contains("foo")
+    assert not bf.contains("bar")
+
+
+def test_no_false_negatives():
+    bf = BlockedBloomFilter(expected_items=10_000)
+    items = [f"item:{i}" for i in range(10_000)]
+    bf.add_many(items)
+    assert all(bf.contains_many(items))
+    assert all(bf.contains(item) for item in items)
+
+
+def test_bit_array_is_whole_blocks():
+    bf = BlockedBloomFilter(expected_items=1_234, false_pos_rate=0.01)
+    assert bf._bit_array_size % BLOCK_BITS == 0
+    assert len(bf._bit_words) * 64 == bf._bit_array_size
+
+
+def test_all_bits_for_a_key_fall_in_one_block():
+    bf = BlockedBloomFilter(expected_items=100_000)
+    for i in range(1_000):
+        hash_vals = bf._hash(f"item:{i}")
+        assert len(hash_vals) == bf._num_hash_fns
+        assert len(set(hash_vals)) == bf._num_hash_fns
+        assert len({h // BLOCK_BITS for h in hash_vals}) == 1
+
+
+def test_false_positive_rate_close_to_target():
+    bf = BlockedBloomFilter(expected_items=10_000, false_pos_rate=0.01)
+    bf.add_many(f"item:{i}" for i in range(10_000))
+
+    test_count = 10_000
+    false_pos = sum(bf.contains_many(f"not_added:{i}" for i in range(test_count)))
+
+    assert 0 < false_pos / test_count < 0.03
+
+
+def test_to_bytes_round_trip():
+    bf = BlockedBloomFilter(expected_items=1_000)
+    items = [f"item:{i}" for i in range(1_000)]
+    bf.add_many(items)
+
+    restored = BlockedBloomFilter.from_bytes(bf.to_bytes())
+    assert restored._bit_words == bf._bit_words
+    assert all(restored.contains_many(items))
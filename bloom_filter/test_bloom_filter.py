@@ -1,3 +1,6 @@
+import pytest
+
+from . import bloom_filter as bloom_filter_module
 from .bloom_filter import BloomFilter
 
 
@@ -86,3 +89,228 @@ def test_allows_some_false_positives():
     # But not too many (proves the rate control works)
     print(fp_rate)
     assert 0 < fp_rate < 0.1
+
+
+def test_add_many_matches_scalar_add_bit_for_bit():
+    items = [f"item:{i}" for i in range(5_000)]
+
+    scalar = BloomFilter(expected_items=5_000)
+    for item in items:
+        scalar.add(item)
+
+    batch = BloomFilter(expected_items=5_000)
+    batch.add_many(items)
+
+    assert batch._bit_words == scalar._bit_words
+
+
+def test_contains_many_matches_scalar_contains():
+    bf = BloomFilter(expected_items=1_000)
+    bf.add_many(f"item:{i}" for i in range(1_000))
+
+    probes = [f"item:{i}" for i in range(0, 2_000, 7)] + ["", "foo", b"bytes"]
+    assert bf.contains_many(probes) == [bf.contains(p) for p in probes]
+
+
+def test_contains_many_has_no_false_negatives():
+    bf = BloomFilter()
+    items = [f"item:{i}" for i in range(1_000)]
+    bf.add_many(items)
+    assert all(bf.contains_many(items))
+
+
+def test_contains_many_on_empty_input():
+    bf = BloomFilter()
+    assert bf.contains_many([]) == []
+
+
+def test_can_create_with_hasher_param():
+    for hasher in ("sha256", "blake2b", "md5"):
+        bf = BloomFilter(expected_items=1_000, hasher=hasher)
+        items = [f"item:{i}" for i in range(1_000)]
+        bf.add_many(items)
+        assert all(bf.contains(item) for item in items)
+        assert not bf.contains("not_added")
+
+
+def test_to_bytes_round_trip():
+    bf = BloomFilter(expected_items=1_000, false_pos_rate=0.01)
+    items = [f"item:{i}" for i in range(1_000)]
+    bf.add_many(items)
+
+    restored = BloomFilter.from_bytes(bf.to_bytes())
+
+    assert restored._bit_array_size == bf._bit_array_size
+    assert restored._num_hash_fns == bf._num_hash_fns
+    assert restored._bit_words == bf._bit_words
+    assert all(restored.contains_many(items))
+    restored.add("new")
+    assert restored.contains("new")
+
+
+def test_to_bytes_preserves_hasher():
+    bf = BloomFilter(expected_items=100, hasher="blake2b")
+    bf.add("foo")
+    restored = BloomFilter.from_bytes(bf.to_bytes())
+    assert restored._hasher.name == "blake2b"
+    assert restored.contains("foo")
+
+
+def test_save_and_open_with_mmap(tmp_path):
+    path = tmp_path / "filter.bloom"
+    bf = BloomFilter(expected_items=10_000)
+    items = [f"item:{i}" for i in range(10_000)]
+    bf.add_many(items)
+    bf.save(path)
+
+    mapped = BloomFilter.open(path, mmap=True)
+    probes = items + [f"other:{i}" for i in range(1_000)]
+    assert mapped.contains_many(probes) == bf.contains_many(probes)
+    assert mapped.contains("item:42")
+    mapped.close()
+
+
+def test_mmap_filter_is_read_only(tmp_path):
+    path = tmp_path / "filter.bloom"
+    BloomFilter().save(path)
+    mapped = BloomFilter.open(path)
+    with pytest.raises(TypeError):
+        mapped.add("foo")
+    mapped.close()
+
+
+def test_in_place_union_unmaps_a_mapped_filter(tmp_path):
+    path = tmp_path / "filter.bloom"
+    saved = BloomFilter()
+    saved.add("foo")
+    saved.save(path)
+    other = BloomFilter()
+    other.add("bar")
+
+    mapped = BloomFilter.open(path)
+    mapped |= other
+    assert mapped._mmap is None
+    assert mapped.contains("foo") and mapped.contains("bar")
+    mapped.add("baz")  # the union is held in memory, so it is writable
+    mapped.close()
+
+
+def test_open_closes_the_map_of_an_invalid_file(tmp_path, monkeypatch):
+    path = tmp_path / "filter.bloom"
+    path.write_bytes(b"not a filter".ljust(4096, b"\0"))
+    maps = []
+    mmap_cls = bloom_filter_module._mmap.mmap
+
+    def tracking_mmap(*args, **kwargs):
+        maps.append(mmap_cls(*args, **kwargs))
+        return maps[-1]
+
+    monkeypatch.setattr(bloom_filter_module._mmap, "mmap", tracking_mmap)
+    with pytest.raises(ValueError, match="not a serialized BloomFilter"):
+        BloomFilter.open(path)
+    assert len(maps) == 1 and maps[0].closed
+
+
+def test_open_without_mmap_copies_into_memory(tmp_path):
+    path = tmp_path / "filter.bloom"
+    bf = BloomFilter()
+    bf.add("foo")
+    bf.save(path)
+
+    loaded = BloomFilter.open(path, mmap=False)
+    assert loaded.contains("foo")
+    loaded.add("bar")
+    assert loaded.contains("bar")
+
+
+def test_from_bytes_rejects_invalid_data():
+    with pytest.raises(ValueError, match="too short"):
+        BloomFilter.from_bytes(b"BLMF")
+    with pytest.raises(ValueError, match="not a serialized BloomFilter"):
+        BloomFilter.from_bytes(b"x" * 64)
+    with pytest.raises(ValueError, match="too short"):
+        BloomFilter.from_bytes(BloomFilter().to_bytes()[:-8])
+
+
+def test_fill_ratio_and_estimated_fpr():
+    bf = BloomFilter(expected_items=1_000, false_pos_rate=0.01)
+    assert bf.fill_ratio == 0
+    assert bf.estimated_fpr == 0
+
+    bf.add_many(f"item:{i}" for i in range(1_000))
+
+    # at capacity roughly half of the bits are set
+    assert bf.fill_ratio == pytest.approx(0.5, abs=0.05)
+    assert bf.estimated_fpr == pytest.approx(0.01, rel=0.5)
+
+
+def test_union_matches_filter_built_from_both_sets():
+    left_items = [f"left:{i}" for i in range(500)]
+    right_items = [f"right:{i}" for i in range(500)]
+
+    left = BloomFilter(expected_items=1_000)
+    left.add_many(left_items)
+    right = BloomFilter(expected_items=1_000)
+    right.add_many(right_items)
+    both = BloomFilter(expected_items=1_000)
+    both.add_many(left_items + right_items)
+
+    union = left.union(right)
+    assert union._bit_words == both._bit_words
+    assert (left | right)._bit_words == both._bit_words
+    assert all(union.contains_many(left_items + right_items))
+
+    # operands are left untouched
+    assert not any(left.contains_many(right_items[:10]))
+
+
+def test_in_place_union():
+    left = BloomFilter()
+    left.add("foo")
+    right = BloomFilter()
+    right.add("bar")
+
+    left |= right
+    assert left.contains("foo")
+    assert left.contains("bar")
+
+
+def test_intersection_contains_shared_items():
+    shared = [f"shared:{i}" for i in range(200)]
+    left = BloomFilter(expected_items=1_000)
+    left.add_many(shared + [f"left:{i}" for i in range(300)])
+    right = BloomFilter(expected_items=1_000)
+    right.add_many(shared + [f"right:{i}" for i in range(300)])
+
+    intersection = left & right
+    assert all(intersection.contains_many(shared))
+    assert intersection.estimated_cardinality() < left.estimated_cardinality()
+
+
+def test_set_algebra_requires_matching_filters():
+    with pytest.raises(ValueError, match="same size"):
+        BloomFilter(expected_items=100) | BloomFilter(expected_items=200)
+    with pytest.raises(ValueError, match="same size"):
+        BloomFilter() & BloomFilter(hasher="blake2b")
+    with pytest.raises(TypeError):
+        BloomFilter() | {"foo"}
+
+
+def test_estimated_cardinality():
+    bf = BloomFilter(expected_items=10_000)
+    assert bf.estimated_cardinality() == 0
+
+    bf.add_many(f"item:{i}" for i in range(5_000))
+    assert bf.estimated_cardinality() == pytest.approx(5_000, rel=0.05)
+
+
+def test_build_parallel_matches_serial_build():
+    items = [f"item:{i}" for i in range(5_000)]
+
+    serial = BloomFilter(expected_items=5_000)
+    serial.add_many(items)
+
+    parallel = BloomFilter.build_parallel(
+        iter(items), workers=2, expected_items=5_000, chunk_size=1_000
+    )
+    assert parallel._bit_words == serial._bit_words
@@ -0,0 +1,180 @@
+import pytest
+
+from .bloom_filter import BloomFilter
+from .counting_bloom_filter import CountingBloomFilter
+
+
+def test_empty_filter_contains_nothing():
+    cbf = CountingBloomFilter()
+    assert not cbf.contains("foo")
+    assert not cbf.contains("")
+
+
+def test_contains_gets_added_item():
+    cbf = CountingBloomFilter()
+    cbf.add("foo")
+    assert cbf.contains("foo")
+    assert not cbf.contains("bar")
+
+
+def test_can_remove_added_item():
+    cbf = CountingBloomFilter()
+    cbf.add("foo")
+    assert cbf.remove("foo") is True
+    assert not cbf.contains("foo")
+
+
+def test_remove_missing_item_returns_false():
+    cbf = CountingBloomFilter()
+    assert cbf.remove("foo") is False
+
+
+def test_item_added_twice_survives_one_removal():
+    cbf = CountingBloomFilter()
+    cbf.add("foo")
+    cbf.add("foo")
+    cbf.remove("foo")
+    assert cbf.contains("foo")
+    cbf.remove("foo")
+    assert not cbf.contains("foo")
+
+
+def test_removal_does_not_cause_false_negatives():
+    cbf = CountingBloomFilter(expected_items=2_000)
+    kept = [f"kept:{i}" for i in range(1_000)]
+    removed = [f"removed:{i}" for i in range(1_000)]
+    cbf.add_many(kept + removed)
+
+    assert all(cbf.remove_many(removed))
+
+    assert all(cbf.contains_many(kept))
+    assert sum(cbf.contains_many(removed)) < 100
+
+
+def test_counters_saturate():
+    cbf = CountingBloomFilter()
+    for _ in range(100):
+        cbf.add("foo")
+    for h in cbf._hash("foo"):
+        assert cbf._get_count(h) == CountingBloomFilter.MAX_COUNT
+
+    # saturated counters are never decremented
+    for _ in range(100):
+        cbf.remove("foo")
+    assert cbf.contains("foo")
+
+
+def test_adjacent_counters_are_independent():
+    cbf = CountingBloomFilter(expected_items=256)
+    cbf._set_bit(0)
+    cbf._set_bit(1)
+    cbf._set_bit(1)
+    assert cbf._get_count(0) == 1
+    assert cbf._get_count(1) == 2
+    cbf._clear_bit(1)
+    assert cbf._get_count(0) == 1
+    assert cbf._get_count(1) == 1
+    assert cbf._get_count(2) == 0
+
+
+def test_batch_operations_match_scalar_operations():
+    items = [f"item:{i}" for i in range(2_000)]
+
+    scalar = CountingBloomFilter(expected_items=2_000)
+    for item in items:
+        scalar.add(item)
+    scalar_removed = [scalar.remove(item) for item in items[::3]]
+
+    batch = CountingBloomFilter(expected_items=2_000)
+    batch.add_many(items)
+    batch_removed = batch.remove_many(items[::3])
+
+    assert batch._counters == scalar._counters
+    assert batch_removed == scalar_removed
+    assert batch.contains_many(items) == [scalar.contains(i) for i in items]
+
+
+def test_uses_four_bits_per_slot():
+    cbf = CountingBloomFilter(expected_items=10_000)
+    bf = BloomFilter(expected_items=10_000)
+    assert cbf._bit_array_size == bf._bit_array_size
+    assert len(cbf._counters) == (cbf._bit_array_size + 1) // 2
+    assert len(cbf._counters) == pytest.approx(4 * len(bf._bit_words) * 8, rel=0.01)
+
+
+def test_fill_ratio_counts_non_zero_slots():
+    cbf = CountingBloomFilter(expected_items=1_000)
+    assert cbf.fill_ratio == 0
+    cbf.add_many(f"item:{i}" for i in range(1_000))
+    assert cbf.fill_ratio == pytest.approx(0.5, abs=0.05)
+
+
+def test_save_and_open_with_mmap(tmp_path):
+    path = tmp_path / "filter.cbloom"
+    cbf = CountingBloomFilter(expected_items=1_000)
+    items = [f"item:{i}" for i in range(1_000)]
+    cbf.add_many(items)
+    cbf.save(path)
+
+    copied = CountingBloomFilter.from_bytes(cbf.to_bytes())
+    assert copied._counters == cbf._counters
+    assert copied.remove("item:0")
+
+    mapped = CountingBloomFilter.open(path, mmap=True)
+    assert all(mapped.contains_many(items))
+    with pytest.raises(TypeError):
+        mapped.add("foo")
+    mapped.close()
+
+    with pytest.raises(ValueError, match="not a serialized CountingBloomFilter"):
+        CountingBloomFilter.from_bytes(BloomFilter().to_bytes())
+
+
+def test_union_adds_counters():
+    left = CountingBloomFilter()
+    left.add_many(["a", "b"])
+    right = CountingBloomFilter()
+    right.add_many(["b", "c"])
+    both = CountingBloomFilter()
+    both.add_many(["a", "b", "b", "c"])
+
+    assert (left | right)._counters == both._counters
+    left |= right
+    assert left._counters == both._counters
+    assert left.remove("b")
+    assert left.contains("b")  # it was added twice
+
+
+def test_union_saturates_counters():
+    left = CountingBloomFilter()
+    right = CountingBloomFilter()
+    for _ in range(10):
+        left.add("a")
+        right.add("a")
+    union = left | right
+    assert all(
+        union._get_count(h) == CountingBloomFilter.MAX_COUNT for h in union._hash("a")
+    )
+
+
+def test_intersection_takes_smaller_counters():
+    left = CountingBloomFilter()
+    left.add_many(["a", "a", "b"])
+    right = CountingBloomFilter()
+    right.add_many(["a", "c"])
+    shared = CountingBloomFilter()
+    shared.add("a")
+
+    assert (left & right)._counters == shared._counters
+    with pytest.raises(ValueError, match="cannot combine"):
+        left | BloomFilter()
+
+
+def test_build_parallel():
+    items = [f"item:{i}" for i in range(5_000)]
+    serial = CountingBloomFilter(expected_items=5_000)
+    serial.add_many(items)
+    parallel = CountingBloomFilter.build_parallel(
+        items, workers=2, expected_items=5_000, chunk_size=1_000
+    )
+    assert parallel._counters == serial._counters
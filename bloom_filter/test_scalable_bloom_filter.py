@@ -0,0 +1,75 @@
+import pytest
+
+from .scalable_bloom_filter import ScalableBloomFilter
+
+
+def test_empty_filter_contains_nothing():
+    sbf = ScalableBloomFilter()
+    assert not sbf.contains("foo")
+    assert len(sbf) == 0
+
+
+def test_contains_gets_added_item():
+    sbf = ScalableBloomFilter()
+    sbf.add("foo")
+    assert sbf.contains("foo")
+    assert not sbf.contains("bar")
+
+
+def test_grows_past_initial_capacity_without_false_negatives():
+    sbf = ScalableBloomFilter(initial_capacity=100, false_pos_rate=0.01)
+    items = [f"item:{i}" for i in range(5_000)]
+    for item in items:
+        sbf.add(item)
+
+    assert len(sbf._slices) > 1
+    assert sbf.capacity >= len(sbf)
+    assert all(sbf.contains(item) for item in items)
+
+
+def test_false_positive_rate_stays_bounded_after_growth():
+    sbf = ScalableBloomFilter(initial_capacity=100, false_pos_rate=0.01)
+    for i in range(10_000):
+        sbf.add(f"item:{i}")
+
+    test_count = 10_000
+    false_pos = sum(sbf.contains(f"not_added:{i}") for i in range(test_count))
+
+    assert false_pos / test_count < 0.02
+    assert sbf.estimated_fpr < 0.02
+
+
+def test_duplicates_do_not_consume_capacity():
+    sbf = ScalableBloomFilter(initial_capacity=10)
+    for _ in range(100):
+        sbf.add("foo")
+    assert len(sbf) == 1
+    assert len(sbf._slices) == 1
+
+
+def test_fill_ratio_increases_as_items_are_added():
+    sbf = ScalableBloomFilter(initial_capacity=1_000)
+    assert sbf.fill_ratio == 0
+    for i in range(500):
+        sbf.add(f"item:{i}")
+    assert 0 < sbf.fill_ratio < 1
+
+
+def test_slices_tighten_error_rate():
+    sbf = ScalableBloomFilter(initial_capacity=10, tightening_ratio=0.5)
+    for i in range(100):
+        sbf.add(f"item:{i}")
+    rates = [s._false_pos_rate for s in sbf._slices]
+    assert rates == sorted(rates, reverse=True)
+    assert sum(rates) < sbf._false_pos_rate
+
+
+def test_init_with_invalid_params_raises_error():
+    with pytest.raises(ValueError, match="initial_capacity"):
+        ScalableBloomFilter(initial_capacity=0)
+    with pytest.raises(ValueError, match="false_pos_rate"):
+        ScalableBloomFilter(false_pos_rate=1.5)
+    with pytest.raises(ValueError, match="growth_factor"):
+        ScalableBloomFilter(growth_factor=0)
+    with pytest.raises(ValueError, match="tightening_ratio"):
+        ScalableBloomFilter(tightening_ratio=1)
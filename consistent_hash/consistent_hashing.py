@@ -1,7 +1,8 @@
-import hashlib
 import bisect
 from typing import Optional
 
+from hashing.hashers import Hasher, get_hasher
+
 
 class ConsistentHashRing:
     """
@@ -14,6 +15,7 @@ class ConsistentHashRing:
     Attributes:
         virtual_nodes (int): Number of virtual hash points per physical nodes
         replication_factor (int): Number of distinct physical nodes each key is assigned to
+        hasher (Hasher): Hash backend used to place virtual nodes and keys on the ring
     """
 
     def __init__(
@@ -21,6 +23,7 @@ class ConsistentHashRing:
         nodes: Optional[list] = None,
         virtual_nodes: int = 100,
         replication_factor: int = 1,
+        hasher: str | Hasher | None = None,
     ) -> None:
         """
         Initialize the hash ring
@@ -29,20 +32,22 @@ class ConsistentHashRing:
             nodes (Iterable[str], optional): Initial list of node identifiers
             virtual_nodes (int): Number of virtual nodes per physical node to smooth distribution
             replication_factor (int): Number of distinct nodes to replicate each key to
+            hasher (str | Hasher | None): Hash backend used to place nodes and keys (default sha256)
         """
         self.virtual_nodes = virtual_nodes
         self.ring = dict()
         self.sorted_keys = []
         self.nodes = set()
         self.replication_factor = replication_factor
+        self.hasher = get_hasher(hasher)
 
         if nodes:
             for node in nodes:
                 self.add_node(node)
 
     def _hash(self, key: str) -> int:
-        """Return an integer hash of the given string using SHA-256"""
-        return int(hashlib.sha256(key.encode("utf-8")).hexdigest(), 16)
+        """Return an integer hash of the given string using the ring's hasher"""
+        return self.hasher.hash(key.encode("utf-8"))
 
     def add_node(self, node: str) -> None:
         """
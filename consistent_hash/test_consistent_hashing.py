@@ -85,3 +85,12 @@ def test_all_nodes_receive_some_keys():
 
     for node in ring.nodes:
         assert node_counts[node] > 0, f"{node} received no keys"
+
+
+def test_can_create_with_hasher_param():
+    for hasher in ("sha256", "blake2b", "md5"):
+        ring = ConsistentHashRing(
+            nodes=["a", "b", "c"], virtual_nodes=100, hasher=hasher
+        )
+        assert ring.get_node("key") in {"a", "b", "c"}
+        assert ring.get_node("key") == ring.get_node("key")
@@ -0,0 +1,109 @@
+"""
+Throughput and accuracy of CountMinSketch updates and queries.
+
+Run with:
+    python -m count_min_sketch.bench_count_min_sketch [--items N]
+"""
+
+import argparse
+import hashlib
+import random
+import time
+from collections import Counter
+
+from .count_min_sketch import CountMinSketch
+
+
+def _legacy_add(cms: CountMinSketch, key: str) -> None:
+    """The original update path: one sha256 per row, on key + row seed."""
+    encoded_key = key.encode("utf-8")
+    for row in range(cms._depth):
+        digest = hashlib.sha256(encoded_key + str(row).encode("utf-8")).hexdigest()
+        cms._matrix[row * cms._width + int(digest, 16) % cms._width] += 1
+
+
+def _rate(n: int, start: float) -> float:
+    return n / (time.perf_counter() - start)
+
+
+def _zipf_stream(num_keys: int, length: int, skew: float, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    weights = [1 / rank**skew for rank in range(1, num_keys + 1)]
+    return rng.choices([f"key:{i}" for i in range(num_keys)], weights, k=length)
+
+
+def accuracy(items: int, skew: float = 1.1) -> None:
+    """Mean absolute error per key on a Zipfian stream, overall and for the tail."""
+    stream = _zipf_stream(items // 10, items, skew)
+    truth = Counter(stream)
+    keys = list(truth)
+    tail = [key for key in keys if truth[key] <= 3]
+
+    def mean_error(cms: CountMinSketch, sample: list[str], estimator: str) -> float:
+        estimates = cms.frequency_many(sample, estimator)
+        return sum(abs(e - truth[k]) for k, e in zip(sample, estimates)) / len(sample)
+
+    print(f"\nzipf s={skew} items={items:,} distinct={len(keys):,} tail={len(tail):,}")
+    print(f"{'width':>7} {'depth':>5}  {'mode':<22} {'MAE all':>10} {'MAE tail':>10}")
+    for width in (500, 2_000, 8_000):
+        for depth in (2, 4, 8):
+            plain = CountMinSketch(width=width, depth=depth)
+            plain.add_many(stream)
+            conservative = CountMinSketch(width=width, depth=depth, conservative=True)
+            for key in stream:
+                conservative.add(key)
+
+            for label, cms, estimator in (
+                ("min", plain, "min"),
+                ("mean_min", plain, "mean_min"),
+                ("conservative min", conservative, "min"),
+            ):
+                print(
+                    f"{width:>7} {depth:>5}  {label:<22}"
+                    f" {mean_error(cms, keys, estimator):>10.2f}"
+                    f" {mean_error(cms, tail, estimator):>10.2f}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=500_000)
+    parser.add_argument("--width", type=int, default=2_000)
+    parser.add_argument("--depth", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    keys = [f"event:{rng.randrange(100_000)}" for _ in range(args.items)]
+    n = len(keys)
+
+    cms = CountMinSketch(width=args.width, depth=args.depth)
+    start = time.perf_counter()
+    for key in keys:
+        _legacy_add(cms, key)
+    legacy = _rate(n, start)
+
+    cms = CountMinSketch(width=args.width, depth=args.depth)
+    start = time.perf_counter()
+    for key in keys:
+        cms.add(key)
+    scalar = _rate(n, start)
+
+    start = time.perf_counter()
+    cms.add_many(keys)
+    batch = _rate(n, start)
+
+    start = time.perf_counter()
+    cms.frequency_many(keys)
+    query = _rate(n, start)
+
+    print(f"width={args.width} depth={args.depth} items={n:,}")
+    print(f"{'sha256 per row (legacy)':<26} {legacy:>12,.0f} ops/sec")
+    print(f"{'add':<26} {scalar:>12,.0f} ops/sec  ({scalar / legacy:.1f}x)")
+    print(f"{'add_many':<26} {batch:>12,.0f} ops/sec  ({batch / legacy:.1f}x)")
+    print(f"{'frequency_many':<26} {query:>12,.0f} ops/sec")
+
+    accuracy(min(n, 200_000))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,22 @@
-import hashlib
 import array
+import copy
+import math
+import operator
+import statistics
+import struct
+import sys
+from collections import Counter
+from typing import Iterable, Iterator, Self
+
+from hashing.hashers import Hasher, get_hasher
+
+# Serialized layout: a fixed little-endian header, the hasher name, zero padding
+# to an 8-byte boundary, then the counter matrix as little-endian uint64 cells.
+_MAGIC = b"CMSK"
+_FORMAT_VERSION = 3  # 3: a key's rows use distinct columns
+_HEADER = struct.Struct(
+    "<4sHIIqQ?H"
+)  # magic, version, w, d, seed, total, cons, name len
 
 
 class CountMinSketch:
@@ -11,9 +28,33 @@ class CountMinSketch:
     - Guarantees no underestimation (one-sided error)
     - Configurable accuracy vs memory trade-off
     - Uses multiple hash functions and takes minimum across rows
+
+    The counters live in one flat uint64 array of depth * width cells, row-major.
+    Each key is hashed once; the digest is split into two base hashes and row i
+    uses column (h1 + i * h2) % width (Kirsch-Mitzenmacher double hashing), with
+    h2 coprime with width so a key's rows use distinct columns while depth <= width.
+
+    With `conservative=True` an update only raises each of the key's counters to
+    the key's new estimated minimum, instead of adding to all of them. Estimates
+    stay upper bounds but collide far less, which matters most for the long tail of
+    skewed streams (Estan and Varghese, "New Directions in Traffic Measurement").
+
+    Sketches with the same width, depth, seed, hasher and update mode hash every key
+    to the same cells, so they can be merged by adding their matrices. That lets
+    workers count disjoint parts of a stream and combine the results.
     """
 
-    def __init__(self, width: int = 100, depth: int = 4):
+    ESTIMATORS = ("min", "mean_min")
+    _TYPECODE = "Q"  # counter type of the matrix
+
+    def __init__(
+        self,
+        width: int = 100,
+        depth: int = 4,
+        hasher: str | Hasher | None = None,
+        conservative: bool = False,
+        seed: int = 0,
+    ):
         if not (isinstance(width, int) and width > 0):
             raise ValueError("width must be a positive integer")
         if not (isinstance(depth, int) and depth > 0):
@@ -21,22 +62,240 @@ class CountMinSketch:
 
         self._width = width
         self._depth = depth
-        self._matrix = [array.array("L", [0] * width) for _ in range(depth)]
+        self._hasher = get_hasher(hasher)
+        self._conservative = conservative
+        self._seed = seed
+        # a non-zero seed salts every key, giving an independent set of hash functions
+        self._salt = b"" if seed == 0 else seed.to_bytes(8, "little", signed=True)
+        self._total = 0
+        self._matrix = array.array(self._TYPECODE, bytes(8 * width * depth))
 
-    def _hash(self, encoded_key: bytes, seed: int) -> int:
-        hash_input = encoded_key + str(seed).encode("utf-8")
-        return int(hashlib.sha256(hash_input).hexdigest(), 16) % self._width
+    def _indexes(self, key: str | bytes) -> list[int]:
+        """Return the flat matrix index of the key's counter in each row."""
+        return next(self._indexes_many((key,)))
 
-    def frequency(self, key: str) -> int:
-        encoded_key = key.encode("utf-8")
-        estimates = []
-        for row in range(self._depth):
-            col = self._hash(encoded_key, row)
-            estimates.append(self._matrix[row][col])
-        return min(estimates)
+    def _indexes_many(self, keys: Iterable[str | bytes]) -> Iterator[list[int]]:
+        """Yield the flat matrix indexes of each key's counters, one hash per key."""
+        hash_pair = self._hasher.hash_pair
+        salt = self._salt
+        width = self._width
+        # the step between rows is coprime with width: any common factor g makes
+        # the columns repeat after width / g rows, and a zero step puts every row
+        # in the same column, leaving the key fewer counters than rows
+        step_range = max(width - 1, 1)
+        gcd = math.gcd
+        row_offsets = [(row, row * width) for row in range(self._depth)]
+
+        for key in keys:
+            if isinstance(key, str):
+                key = key.encode("utf-8")
+            hash_1, hash_2 = hash_pair(salt + key)
+            hash_1 %= width
+            hash_2 = hash_2 % step_range + 1
+            while gcd(hash_2, width) != 1:
+                # ends by width - 1 at the latest, which is coprime with width
+                hash_2 += 1
+            yield [
+                offset + (hash_1 + row * hash_2) % width for row, offset in row_offsets
+            ]
+
+    def frequency(self, key: str, estimator: str = "min") -> int:
+        """
+        Estimate how many times a key was added.
+
+        Args:
+            key: The key to look up.
+            estimator: "min" returns the smallest of the key's counters, which never
+                underestimates. "mean_min" (Count-Mean-Min, Deng and Rafiei)
+                subtracts each row's expected collision noise, (total - counter) /
+                (width - 1), takes the median and caps it at the "min" estimate. It
+                is much closer on rare keys but may underestimate.
+        """
+        return self.frequency_many((key,), estimator)[0]
 
     def add(self, key: str, count: int = 1):
-        encoded_key = key.encode("utf-8")
-        for row in range(self._depth):
-            col = self._hash(encoded_key, row)
-            self._matrix[row][col] += count
+        matrix = self._matrix
+        self._total += count
+        idx = self._indexes(key)
+        if self._conservative:
+            target = min(matrix[i] for i in idx) + count
+            for i in idx:
+                if matrix[i] < target:
+                    matrix[i] = target
+        else:
+            for i in idx:
+                matrix[i] += count
+
+    def frequency_many(self, keys: Iterable[str], estimator: str = "min") -> list[int]:
+        """Estimate the frequency of each key, in order. See `frequency`."""
+        if estimator not in self.ESTIMATORS:
+            raise ValueError(f"estimator must be one of {self.ESTIMATORS}")
+
+        matrix = self._matrix
+        if estimator == "min" or self._width == 1:
+            return [min(matrix[i] for i in idx) for idx in self._indexes_many(keys)]
+
+        if self._conservative:
+            # conservative rows no longer sum to the stream total
+            raise ValueError("mean_min estimator requires conservative=False")
+
+        total = self._total
+        scale = self._width - 1
+        estimates = []
+        for idx in self._indexes_many(keys):
+            counters = [matrix[i] for i in idx]
+            debiased = statistics.median(c - (total - c) / scale for c in counters)
+            estimates.append(max(0, min(round(debiased), min(counters))))
+        return estimates
+
+    def add_many(self, keys: Iterable[str], counts: Iterable[int] | None = None):
+        """
+        Add many keys in one pass.
+
+        Args:
+            keys: The keys to add.
+            counts: The count to add for each key, defaulting to 1 for every key.
+        """
+        # Collapse repeated keys first so each distinct key is hashed only once.
+        # Event streams are usually skewed, so this removes most of the hashing.
+        # In conservative mode this reorders updates, which can change the
+        # estimates slightly but keeps them upper bounds.
+        totals = Counter()
+        if counts is None:
+            totals.update(keys)
+        else:
+            for key, count in zip(keys, counts, strict=True):
+                totals[key] += count
+
+        matrix = self._matrix
+        self._total += totals.total()
+        for idx, count in zip(self._indexes_many(totals), totals.values()):
+            if self._conservative:
+                target = min(matrix[i] for i in idx) + count
+                for i in idx:
+                    if matrix[i] < target:
+                        matrix[i] = target
+            else:
+                for i in idx:
+                    matrix[i] += count
+
+    def merge(self, other: Self) -> Self:
+        """
+        Add another sketch's counts into this one.
+
+        Both sketches must have the same type, width, depth, seed, hasher and update
+        mode. The result estimates frequencies over the combined streams.
+        """
+        if (
+            type(self) is not type(other)
+            or self._width != other._width
+            or self._depth != other._depth
+            or self._seed != other._seed
+            or self._hasher.name != other._hasher.name
+            or self._conservative != other._conservative
+        ):
+            raise ValueError(
+                "sketches must share type, width, depth, seed, hasher and update mode"
+            )
+        self._matrix = array.array(
+            self._TYPECODE, map(operator.add, self._matrix, other._matrix)
+        )
+        self._total += other._total
+        return self
+
+    def copy(self) -> Self:
+        """Return an independent copy of the sketch."""
+        clone = copy.copy(self)
+        clone._matrix = array.array(self._TYPECODE, self._matrix)
+        return clone
+
+    def __iadd__(self, other: Self) -> Self:
+        if not isinstance(other, CountMinSketch):
+            return NotImplemented
+        return self.merge(other)
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact header followed by the raw counter matrix."""
+        name = self._hasher.name.encode("utf-8")
+        header = _HEADER.pack(
+            _MAGIC,
+            _FORMAT_VERSION,
+            self._width,
+            self._depth,
+            self._seed,
+            self._total,
+            self._conservative,
+            len(name),
+        )
+        header += name
+        header += bytes(-len(header) % 8)
+
+        matrix = self._matrix
+        if sys.byteorder == "big":
+            matrix = array.array("Q", matrix)
+            matrix.byteswap()
+        return header + matrix.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Self:
+        """Deserialize a sketch produced by `to_bytes`."""
+        if len(data) < _HEADER.size:
+            raise ValueError("data is too short to be a serialized CountMinSketch")
+        magic, version, width, depth, seed, total, conservative, name_len = (
+            _HEADER.unpack_from(data)
+        )
+        if magic != _MAGIC:
+            raise ValueError("data is not a serialized CountMinSketch")
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"unsupported CountMinSketch format version {version}")
+
+        offset = _HEADER.size + name_len
+        name = bytes(data[_HEADER.size : offset]).decode("utf-8")
+        offset += -offset % 8
+        end = offset + 8 * width * depth
+        if len(data) < end:
+            raise ValueError("data is too short for the CountMinSketch matrix")
+
+        cms = cls(width, depth, name, conservative, seed)
+        cms._total = total
+        cms._matrix = array.array("Q")
+        cms._matrix.frombytes(data[offset:end])
+        if sys.byteorder == "big":
+            cms._matrix.byteswap()
+        return cms
+
+
+def merge_sketches(
+    sketches: Iterable[CountMinSketch | bytes],
+    cls: type[CountMinSketch] | None = None,
+) -> CountMinSketch:
+    """
+    Reduce many compatible sketches into one.
+
+    Accepts sketches or their `to_bytes` payloads, so the results of a
+    multiprocessing pool (or of other hosts) can be reduced as they arrive without
+    shipping pickled objects. Payloads are decoded with `cls.from_bytes`, using its
+    default arguments. `cls` defaults to the class of the first item if that is a
+    sketch, and to CountMinSketch otherwise, so pass
+    `cls=DecayingCountMinSketch` to reduce a stream of decaying payloads. The first
+    sketch is copied, so none of the inputs is modified.
+
+    Raises:
+        ValueError: If there are no sketches, or they are not compatible.
+    """
+    result = None
+    for sketch in sketches:
+        if cls is None:
+            cls = type(sketch) if isinstance(sketch, CountMinSketch) else CountMinSketch
+        if not isinstance(sketch, CountMinSketch):
+            sketch = cls.from_bytes(sketch)
+        elif result is None:
+            # copy the first sketch so the caller's object is left untouched
+            sketch = sketch.copy()
+        if result is None:
+            result = sketch
+        else:
+            result.merge(sketch)
+    if result is None:
+        raise ValueError("no sketches to merge")
+    return result
@@ -0,0 +1,123 @@
+from collections import Counter
+from typing import Iterable
+
+from hashing.hashers import Hasher
+
+from .count_min_sketch import CountMinSketch
+
+
+class HeavyHitters:
+    """
+    Top-k frequent keys of a stream, on top of a Count-Min Sketch.
+
+    SPEC:
+    - Counts every key in a CountMinSketch
+    - Keeps the k keys with the highest estimates in a bounded min-heap
+    - Each update costs one sketch update plus O(log k) heap maintenance
+    - Memory is the sketch plus k heap entries, independent of stream size
+
+    The heap is indexed by key, so a key already in the top-k is re-sifted in place
+    when its estimate grows rather than pushed again. A new key replaces the heap
+    minimum only when its estimate is larger. Estimates come from the sketch, so
+    they inherit its one-sided error.
+    """
+
+    def __init__(
+        self,
+        k: int = 10,
+        width: int = 1_000,
+        depth: int = 4,
+        hasher: str | Hasher | None = None,
+        conservative: bool = False,
+    ):
+        if not (isinstance(k, int) and k > 0):
+            raise ValueError("k must be a positive integer")
+
+        self._k = k
+        self._sketch = CountMinSketch(width, depth, hasher, conservative)
+        self._heap: list[str] = []  # keys, min-heap ordered by estimate
+        self._positions: dict[str, int] = {}  # key -> index in _heap
+        self._estimates: dict[str, int] = {}  # key -> estimate, for keys in _heap
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, key: str, count: int = 1):
+        self._sketch.add(key, count)
+        self._offer(key, self._sketch.frequency(key))
+
+    def add_many(self, keys: Iterable[str], counts: Iterable[int] | None = None):
+        """
+        Add many keys in one pass.
+
+        The batch is folded per key and the sketch is updated once. Only the
+        touched keys are offered to the heap, at their final estimates; estimates
+        only grow, so this gives the same top-k as offering after every update.
+        """
+        totals = Counter()
+        if counts is None:
+            totals.update(keys)
+        else:
+            for key, count in zip(keys, counts, strict=True):
+                totals[key] += count
+
+        self._sketch.add_many(totals.keys(), totals.values())
+        for key, estimate in zip(totals, self._sketch.frequency_many(totals)):
+            self._offer(key, estimate)
+
+    def top(self, n: int | None = None) -> list[tuple[str, int]]:
+        """Return up to n (default k) tracked keys and estimates, most frequent first."""
+        ranked = sorted(self._estimates.items(), key=lambda item: item[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def frequency(self, key: str) -> int:
+        return self._sketch.frequency(key)
+
+    def _offer(self, key: str, estimate: int):
+        if key in self._positions:
+            self._estimates[key] = estimate
+            self._sift_down(self._positions[key])
+        elif len(self._heap) < self._k:
+            self._estimates[key] = estimate
+            self._positions[key] = len(self._heap)
+            self._heap.append(key)
+            self._sift_up(len(self._heap) - 1)
+        elif estimate > self._estimates[self._heap[0]]:
+            evicted = self._heap[0]
+            del self._positions[evicted]
+            del self._estimates[evicted]
+            self._estimates[key] = estimate
+            self._positions[key] = 0
+            self._heap[0] = key
+            self._sift_down(0)
+
+    def _sift_up(self, i: int):
+        heap, estimates = self._heap, self._estimates
+        key = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if estimates[heap[parent]] <= estimates[key]:
+                break
+            heap[i] = heap[parent]
+            self._positions[heap[i]] = i
+            i = parent
+        heap[i] = key
+        self._positions[key] = i
+
+    def _sift_down(self, i: int):
+        heap, estimates = self._heap, self._estimates
+        size = len(heap)
+        key = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and estimates[heap[child + 1]] < estimates[heap[child]]:
+                child += 1
+            if estimates[key] <= estimates[heap[child]]:
+                break
+            heap[i] = heap[child]
+            self._positions[heap[i]] = i
+            i = child
+        heap[i] = key
+        self._positions[key] = i
@@ -1,5 +1,9 @@
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
 import pytest
-from .count_min_sketch import CountMinSketch
+from .count_min_sketch import CountMinSketch, merge_sketches
 
 
 def test_can_create_count_min_sketch():
@@ -116,3 +120,223 @@ def test_handle_counts_greater_than_255():
 
     # This assertion is expected to fail with the current implementation
     assert estimated_freq >= true_count
+
+
+def test_can_create_with_hasher_param():
+    for hasher in ("sha256", "blake2b", "md5"):
+        cms = CountMinSketch(width=1_000, depth=4, hasher=hasher)
+        cms.add("foo", 3)
+        assert cms.frequency("foo") == 3
+        assert cms.frequency("bar") == 0
+
+
+def test_unknown_hasher_raises_error():
+    with pytest.raises(ValueError, match="unknown hasher"):
+        CountMinSketch(hasher="nope")
+
+
+def test_add_many_matches_scalar_add():
+    keys = [f"item_{i % 100}" for i in range(1_000)]
+
+    scalar = CountMinSketch(width=500, depth=4)
+    for key in keys:
+        scalar.add(key)
+
+    batch = CountMinSketch(width=500, depth=4)
+    batch.add_many(keys)
+
+    assert batch._matrix == scalar._matrix
+    assert batch.frequency_many(keys[:100]) == [scalar.frequency(k) for k in keys[:100]]
+
+
+def test_add_many_with_counts():
+    cms = CountMinSketch(width=1_000, depth=4)
+    cms.add_many(["foo", "bar", "foo"], counts=[2, 5, 3])
+    assert cms.frequency_many(["foo", "bar", "baz"]) == [5, 5, 0]
+
+
+def test_add_many_rejects_mismatched_counts():
+    cms = CountMinSketch()
+    with pytest.raises(ValueError):
+        cms.add_many(["foo", "bar"], counts=[1])
+
+
+def test_each_row_uses_its_own_column():
+    cms = CountMinSketch(width=1_000, depth=4)
+    indexes = cms._indexes("foo")
+    assert len(indexes) == 4
+    for row, i in enumerate(indexes):
+        assert row * 1_000 <= i < (row + 1) * 1_000
+
+
+@pytest.mark.parametrize("width, depth", [(2, 2), (100, 4), (12, 12)])
+def test_rows_never_share_a_column(width, depth):
+    # a step sharing a factor with width repeats columns within depth rows
+    cms = CountMinSketch(width=width, depth=depth)
+    for i in range(2_000):
+        columns = {index % width for index in cms._indexes(f"key_{i}")}
+        assert len(columns) == depth
+
+
+def _zipf_stream(num_keys: int, length: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, num_keys + 1)]
+    return rng.choices([f"key_{i}" for i in range(num_keys)], weights, k=length)
+
+
+def test_conservative_update_never_underestimates():
+    stream = _zipf_stream(2_000, 20_000)
+    truth = Counter(stream)
+
+    cms = CountMinSketch(width=200, depth=4, conservative=True)
+    for key in stream:
+        cms.add(key)
+
+    for key, count in truth.items():
+        assert cms.frequency(key) >= count
+
+
+def test_conservative_update_overestimates_less():
+    stream = _zipf_stream(2_000, 20_000)
+    truth = Counter(stream)
+
+    plain = CountMinSketch(width=200, depth=4)
+    conservative = CountMinSketch(width=200, depth=4, conservative=True)
+    plain.add_many(stream)
+    conservative.add_many(stream)
+
+    keys = list(truth)
+    plain_error = sum(plain.frequency_many(keys)) - truth.total()
+    conservative_error = sum(conservative.frequency_many(keys)) - truth.total()
+    assert 0 <= conservative_error < plain_error
+
+
+def test_conservative_add_with_count():
+    cms = CountMinSketch(width=1_000, depth=4, conservative=True)
+    cms.add("foo", 5)
+    cms.add("foo")
+    assert cms.frequency("foo") == 6
+
+
+def test_mean_min_estimator_reduces_tail_error():
+    stream = _zipf_stream(2_000, 20_000)
+    truth = Counter(stream)
+
+    cms = CountMinSketch(width=200, depth=5)
+    cms.add_many(stream)
+
+    tail = [key for key, count in truth.items() if count <= 2]
+    min_error = sum(
+        abs(est - truth[key]) for key, est in zip(tail, cms.frequency_many(tail))
+    )
+    mean_min_error = sum(
+        abs(est - truth[key])
+        for key, est in zip(tail, cms.frequency_many(tail, estimator="mean_min"))
+    )
+    assert mean_min_error < min_error
+
+
+def test_mean_min_estimator_is_capped_by_min():
+    cms = CountMinSketch(width=100, depth=4)
+    for i in range(1_000):
+        cms.add(f"item_{i}")
+    for i in range(10):
+        key = f"item_{i}"
+        assert 0 <= cms.frequency(key, "mean_min") <= cms.frequency(key)
+
+
+def test_invalid_estimator_raises_error():
+    cms = CountMinSketch()
+    with pytest.raises(ValueError, match="estimator must be one of"):
+        cms.frequency("foo", estimator="max")
+    with pytest.raises(ValueError, match="requires conservative=False"):
+        CountMinSketch(conservative=True).frequency("foo", estimator="mean_min")
+
+
+def _count_chunk(keys: list[str]) -> bytes:
+    cms = CountMinSketch(width=500, depth=4)
+    cms.add_many(keys)
+    return cms.to_bytes()
+
+
+def test_merge_matches_single_sketch():
+    stream = _zipf_stream(500, 5_000)
+    left, right = stream[:2_000], stream[2_000:]
+
+    single = CountMinSketch(width=300, depth=4)
+    single.add_many(stream)
+
+    merged = CountMinSketch(width=300, depth=4)
+    merged.add_many(left)
+    other = CountMinSketch(width=300, depth=4)
+    other.add_many(right)
+    merged += other
+
+    assert merged._matrix == single._matrix
+    assert merged._total == single._total
+
+
+def test_merge_requires_matching_sketches():
+    with pytest.raises(ValueError, match="must share"):
+        CountMinSketch(width=100).merge(CountMinSketch(width=200))
+    with pytest.raises(ValueError, match="must share"):
+        CountMinSketch(seed=1).merge(CountMinSketch(seed=2))
+    with pytest.raises(ValueError, match="must share"):
+        CountMinSketch().merge(CountMinSketch(hasher="md5"))
+
+
+def test_seed_changes_hash_functions():
+    assert CountMinSketch(seed=1)._indexes("foo") != CountMinSketch()._indexes("foo")
+    assert CountMinSketch(seed=1)._indexes("foo") == CountMinSketch(seed=1)._indexes(
+        "foo"
+    )
+
+
+def test_to_bytes_round_trip():
+    cms = CountMinSketch(width=300, depth=5, hasher="blake2b", seed=7)
+    cms.add_many(_zipf_stream(500, 5_000))
+
+    data = cms.to_bytes()
+    restored = CountMinSketch.from_bytes(data)
+
+    assert len(data) < 8 * 300 * 5 + 64
+    assert restored._matrix == cms._matrix
+    assert restored._total == cms._total
+    assert restored.frequency("key_0") == cms.frequency("key_0")
+    restored.add("key_0")
+    assert restored.frequency("key_0") == cms.frequency("key_0") + 1
+
+
+def test_from_bytes_rejects_invalid_data():
+    with pytest.raises(ValueError, match="too short"):
+        CountMinSketch.from_bytes(b"CMSK")
+    with pytest.raises(ValueError, match="not a serialized CountMinSketch"):
+        CountMinSketch.from_bytes(b"x" * 64)
+    with pytest.raises(ValueError, match="too short"):
+        CountMinSketch.from_bytes(CountMinSketch().to_bytes()[:-8])
+
+
+def test_merge_sketches_from_process_pool():
+    stream = _zipf_stream(500, 8_000)
+    chunks = [stream[i : i + 2_000] for i in range(0, len(stream), 2_000)]
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        merged = merge_sketches(pool.map(_count_chunk, chunks))
+
+    single = CountMinSketch(width=500, depth=4)
+    single.add_many(stream)
+    assert merged._matrix == single._matrix
+
+
+def test_merge_sketches_does_not_modify_inputs():
+    first = CountMinSketch()
+    first.add("foo")
+    second = CountMinSketch()
+    second.add("foo")
+
+    merged = merge_sketches([first, second.to_bytes()])
+    assert merged.frequency("foo") == 2
+    assert first.frequency("foo") == 1
+
+    with pytest.raises(ValueError, match="no sketches"):
+        merge_sketches([])
@@ -0,0 +1,77 @@
+import random
+from collections import Counter
+
+import pytest
+from .heavy_hitters import HeavyHitters
+
+
+def _is_min_heap(hh: HeavyHitters) -> bool:
+    est = [hh._estimates[key] for key in hh._heap]
+    return all(est[(i - 1) // 2] <= est[i] for i in range(1, len(est)))
+
+
+def test_can_create_heavy_hitters():
+    hh = HeavyHitters()
+    assert hh is not None
+    assert hh.top() == []
+
+
+def test_tracks_added_keys():
+    hh = HeavyHitters(k=3)
+    hh.add("foo")
+    hh.add("foo")
+    hh.add("bar")
+    assert hh.top() == [("foo", 2), ("bar", 1)]
+
+
+def test_keeps_only_k_keys():
+    hh = HeavyHitters(k=5, width=2_000)
+    for i in range(100):
+        hh.add(f"item_{i}", count=i + 1)
+
+    assert len(hh) == 5
+    assert [key for key, _ in hh.top()] == [f"item_{i}" for i in range(99, 94, -1)]
+    assert _is_min_heap(hh)
+
+
+def test_finds_heavy_hitters_in_skewed_stream():
+    rng = random.Random(0)
+    keys = [f"key_{i}" for i in range(1_000)]
+    weights = [1 / rank for rank in range(1, 1_001)]
+    stream = rng.choices(keys, weights, k=50_000)
+    truth = Counter(stream)
+
+    hh = HeavyHitters(k=10, width=2_000, depth=4)
+    for key in stream:
+        hh.add(key)
+
+    expected = {key for key, _ in truth.most_common(5)}
+    assert expected <= {key for key, _ in hh.top()}
+    for key, estimate in hh.top():
+        assert estimate >= truth[key]
+    assert _is_min_heap(hh)
+
+
+def test_add_many_matches_add():
+    rng = random.Random(1)
+    stream = [f"key_{int(rng.paretovariate(1.2))}" for _ in range(5_000)]
+
+    one_by_one = HeavyHitters(k=5)
+    for key in stream:
+        one_by_one.add(key)
+
+    batch = HeavyHitters(k=5)
+    batch.add_many(stream)
+
+    assert batch.top() == one_by_one.top()
+
+
+def test_top_n():
+    hh = HeavyHitters(k=5)
+    hh.add_many(["a", "b", "b", "c", "c", "c"])
+    assert hh.top(2) == [("c", 3), ("b", 2)]
+
+
+def test_invalid_k_raises_error():
+    with pytest.raises(ValueError, match="k must be a positive integer"):
+        HeavyHitters(k=0)
@@ -0,0 +1,185 @@
+import pytest
+from .count_min_sketch import CountMinSketch, merge_sketches
+from .windowed_count_min_sketch import DecayingCountMinSketch, WindowedCountMinSketch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_windowed_counts_within_current_bucket():
+    cms = WindowedCountMinSketch(width=1_000, bucket_items=100)
+    cms.add("foo")
+    cms.add("foo", 2)
+    assert cms.frequency("foo") == 3
+    assert cms.frequency("bar") == 0
+
+
+def test_windowed_rotates_on_item_count():
+    cms = WindowedCountMinSketch(width=1_000, num_buckets=3, bucket_items=10)
+    cms.add_many(["old"] * 10)  # fills bucket 1
+    cms.add_many(["mid"] * 10)  # fills bucket 2
+    cms.add_many(["new"] * 5)
+
+    assert cms.frequency("new", window=1) == 5
+    assert cms.frequency("mid", window=1) == 0
+    assert cms.frequency("mid", window=2) == 10
+    assert cms.frequency("old", window=3) == 10
+
+    cms.add_many(["new"] * 5)  # rotates, dropping "old"
+    assert cms.frequency("old") == 0
+    assert cms.frequency("new") == 10
+
+
+def test_windowed_add_many_splits_at_bucket_boundaries():
+    cms = WindowedCountMinSketch(width=1_000, num_buckets=4, bucket_items=10)
+    cms.add_many(["foo"] * 25)
+    assert cms.frequency("foo", window=1) == 5
+    assert cms.frequency("foo") == 25
+
+
+def test_windowed_rotates_on_clock():
+    clock = FakeClock()
+    cms = WindowedCountMinSketch(
+        width=1_000, num_buckets=3, bucket_seconds=10, clock=clock
+    )
+    cms.add("foo")
+    clock.now = 10
+    cms.add("foo", 2)
+    assert cms.frequency("foo", window=1) == 2
+    assert cms.frequency("foo") == 3
+
+    clock.now = 30  # two more periods: the bucket holding the first add is gone
+    assert cms.frequency("foo") == 2
+
+    clock.now = 1_000  # idle for longer than the whole window
+    assert cms.frequency("foo") == 0
+
+
+def test_windowed_memory_is_bounded():
+    cms = WindowedCountMinSketch(width=100, depth=2, num_buckets=4, bucket_items=50)
+    cms.add_many(f"key_{i}" for i in range(10_000))
+    assert len(cms._buckets) == 4
+
+
+def test_windowed_invalid_params_raise_error():
+    with pytest.raises(ValueError, match="exactly one of"):
+        WindowedCountMinSketch()
+    with pytest.raises(ValueError, match="exactly one of"):
+        WindowedCountMinSketch(bucket_seconds=1, bucket_items=1)
+    with pytest.raises(ValueError, match="num_buckets"):
+        WindowedCountMinSketch(num_buckets=0, bucket_items=1)
+    with pytest.raises(ValueError, match="window must be between"):
+        WindowedCountMinSketch(num_buckets=2, bucket_items=1).frequency("foo", 3)
+
+
+def test_decaying_count_halves_every_half_life():
+    clock = FakeClock()
+    cms = DecayingCountMinSketch(width=1_000, half_life=10, clock=clock)
+    cms.add("foo", 8)
+    assert cms.frequency("foo") == pytest.approx(8)
+
+    clock.now = 10
+    assert cms.frequency("foo") == pytest.approx(4)
+
+    cms.add("foo", 4)
+    clock.now = 20
+    assert cms.frequency("foo") == pytest.approx(4)
+
+
+def test_decaying_add_many():
+    clock = FakeClock()
+    cms = DecayingCountMinSketch(width=1_000, half_life=1, clock=clock)
+    clock.now = 3
+    cms.add_many(["foo", "foo", "bar"])
+    cms.add_many(["foo"], counts=[2])
+    assert cms.frequency_many(["foo", "bar"]) == pytest.approx([4, 1])
+
+
+def test_decaying_renormalizes_lazily():
+    clock = FakeClock()
+    cms = DecayingCountMinSketch(width=1_000, half_life=1, clock=clock)
+    cms.add("foo", 2**40)
+
+    clock.now = 20
+    cms.add("bar")
+    assert cms._landmark == 0
+
+    clock.now = 40  # past _RENORMALIZE_AFTER half-lives
+    assert cms.frequency("foo") == pytest.approx(1)
+    assert cms._landmark == 40
+    assert cms.frequency("bar") == pytest.approx(2**-20)
+
+
+def test_decaying_merge_rescales_to_a_common_landmark():
+    clock = FakeClock()
+    older = DecayingCountMinSketch(width=1_000, half_life=1, clock=clock)
+    older.add("foo", 4)
+    clock.now = 40  # past _RENORMALIZE_AFTER half-lives, so landmarks differ
+    newer = DecayingCountMinSketch(width=1_000, half_life=1, clock=clock)
+    newer.add("foo", 2**40)
+    newer.add("bar", 2)
+
+    merged = merge_sketches([newer, older])
+    assert merged.frequency("foo") == pytest.approx(2**40 + 4 * 2**-40)
+    assert newer.frequency("bar") == pytest.approx(2)  # inputs are untouched
+
+    older += newer
+    assert older.frequency("foo") == pytest.approx(merged.frequency("foo"))
+    assert older.frequency("bar") == pytest.approx(2)
+
+
+def test_merge_sketches_decodes_decaying_payloads():
+    payloads = []
+    for key in ("foo", "bar"):
+        cms = DecayingCountMinSketch(width=1_000, half_life=3_600)
+        cms.add(key, 3)
+        payloads.append(cms.to_bytes())
+
+    merged = merge_sketches(payloads, cls=DecayingCountMinSketch)
+    assert isinstance(merged, DecayingCountMinSketch)
+    assert merged.frequency("foo") == pytest.approx(3, rel=1e-3)
+    assert merged.frequency("bar") == pytest.approx(3, rel=1e-3)
+    with pytest.raises(ValueError, match="not a serialized CountMinSketch"):
+        merge_sketches(payloads)
+
+
+def test_decaying_merge_after_a_long_idle_gap():
+    clock = FakeClock()
+    idle = DecayingCountMinSketch(width=1_000, half_life=1, clock=clock)
+    idle.add("foo", 4)
+    clock.now = 2_000  # far past the float range of 2^(idle time)
+    fresh = DecayingCountMinSketch(width=1_000, half_life=1, clock=clock)
+    fresh.add("bar", 2)
+
+    idle.merge(fresh)
+    assert idle.frequency("bar") == pytest.approx(2)
+    assert idle.frequency("foo") == 0
+    fresh.merge(idle)
+    assert fresh.frequency("bar") == pytest.approx(4)
+
+
+def test_decaying_merge_requires_matching_half_life():
+    with pytest.raises(ValueError, match="half_life"):
+        DecayingCountMinSketch(half_life=1).merge(DecayingCountMinSketch(half_life=2))
+    with pytest.raises(ValueError, match="half_life"):
+        DecayingCountMinSketch().merge(CountMinSketch())
+    with pytest.raises(ValueError, match="must share type"):
+        CountMinSketch().merge(DecayingCountMinSketch())
+
+
+def test_decaying_to_bytes_round_trip():
+    clock = FakeClock()
+    cms = DecayingCountMinSketch(width=500, half_life=2, seed=7, clock=clock)
+    cms.add_many(["foo", "foo", "bar"])
+    clock.now = 2
+
+    restored = DecayingCountMinSketch.from_bytes(cms.to_bytes(), clock=clock)
+    assert restored.frequency_many(["foo", "bar"]) == pytest.approx([1, 0.5])
+    assert restored.to_bytes() == cms.to_bytes()
+    with pytest.raises(ValueError, match="not a serialized DecayingCountMinSketch"):
+        DecayingCountMinSketch.from_bytes(CountMinSketch().to_bytes())
@@ -0,0 +1,306 @@
+import array
+import itertools
+import struct
+import sys
+import time
+from typing import Callable, Iterable, Self
+
+from hashing.hashers import Hasher
+
+from .count_min_sketch import CountMinSketch
+
+# Serialized layout of a DecayingCountMinSketch: a fixed little-endian header, the
+# hasher name, zero padding to an 8-byte boundary, then the matrix as little-endian
+# float64 cells.
+_DECAYING_MAGIC = b"DCMS"
+_DECAYING_FORMAT_VERSION = 3  # 3: a key's rows use distinct columns
+_DECAYING_HEADER = struct.Struct(
+    "<4sHIIqd?ddH"
+)  # magic, version, w, d, seed, total, cons, half-life, landmark, name len
+
+
+class WindowedCountMinSketch:
+    """
+    Count-Min Sketch over a sliding window of recent buckets.
+
+    SPEC:
+    - Keeps a ring of `num_buckets` sub-sketches; updates go to the newest one
+    - The ring rotates every `bucket_seconds` of clock time or every `bucket_items`
+      added counts, clearing the oldest bucket for reuse
+    - frequency(key, window=n) sums the key's estimate over the n newest buckets
+    - Memory is fixed at num_buckets sketches
+
+    All buckets share one seed and hasher, so a key is hashed once per query.
+    """
+
+    def __init__(
+        self,
+        width: int = 100,
+        depth: int = 4,
+        num_buckets: int = 6,
+        bucket_seconds: float | None = None,
+        bucket_items: int | None = None,
+        hasher: str | Hasher | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not (isinstance(num_buckets, int) and num_buckets > 0):
+            raise ValueError("num_buckets must be a positive integer")
+        if (bucket_seconds is None) == (bucket_items is None):
+            raise ValueError(
+                "exactly one of bucket_seconds or bucket_items is required"
+            )
+        if bucket_seconds is not None and bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+        if bucket_items is not None and not (
+            isinstance(bucket_items, int) and bucket_items > 0
+        ):
+            raise ValueError("bucket_items must be a positive integer")
+
+        self._num_buckets = num_buckets
+        self._bucket_seconds = bucket_seconds
+        self._bucket_items = bucket_items
+        self._clock = clock
+        self._buckets = [
+            CountMinSketch(width, depth, hasher) for _ in range(num_buckets)
+        ]
+        self._current = 0  # index of the newest bucket
+        self._bucket_started = clock()
+        self._bucket_count = 0  # counts added to the newest bucket
+
+    def add(self, key: str, count: int = 1):
+        self._advance_clock()
+        self._buckets[self._current].add(key, count)
+        self._count_items(count)
+
+    def add_many(self, keys: Iterable[str]):
+        """Add many keys, one count each, splitting the batch at bucket boundaries."""
+        self._advance_clock()
+        if self._bucket_items is None:
+            self._buckets[self._current].add_many(keys)
+            return
+
+        keys = iter(keys)
+        while True:
+            room = self._bucket_items - self._bucket_count
+            batch = list(itertools.islice(keys, room))
+            if not batch:
+                break
+            self._buckets[self._current].add_many(batch)
+            self._count_items(len(batch))
+
+    def frequency(self, key: str, window: int | None = None) -> int:
+        """
+        Estimate the key's count over the `window` newest buckets (default: all).
+
+        The newest bucket may be only partly filled, so a window of n buckets
+        covers between n - 1 and n bucket periods.
+        """
+        if window is None:
+            window = self._num_buckets
+        if not (isinstance(window, int) and 0 < window <= self._num_buckets):
+            raise ValueError(f"window must be between 1 and {self._num_buckets}")
+
+        self._advance_clock()
+        idx = self._buckets[0]._indexes(key)
+        total = 0
+        for age in range(window):
+            matrix = self._buckets[(self._current - age) % self._num_buckets]._matrix
+            total += min(matrix[i] for i in idx)
+        return total
+
+    def _count_items(self, count: int):
+        if self._bucket_items is None:
+            return
+        self._bucket_count += count
+        if self._bucket_count >= self._bucket_items:
+            self._rotate(1)
+
+    def _advance_clock(self):
+        if self._bucket_seconds is None:
+            return
+        elapsed = self._clock() - self._bucket_started
+        steps = int(elapsed // self._bucket_seconds)
+        if steps > 0:
+            self._rotate(steps)
+            self._bucket_started += steps * self._bucket_seconds
+
+    def _rotate(self, steps: int):
+        """Move the newest-bucket cursor forward, clearing each bucket it enters."""
+        for _ in range(min(steps, self._num_buckets)):
+            self._current = (self._current + 1) % self._num_buckets
+            old = self._buckets[self._current]
+            self._buckets[self._current] = CountMinSketch(
+                old._width, old._depth, old._hasher
+            )
+        self._bucket_count = 0
+
+
+class DecayingCountMinSketch(CountMinSketch):
+    """
+    Count-Min Sketch whose counts decay exponentially with age.
+
+    A count added t seconds ago is worth count * 2^(-t / half_life) today.
+
+    Decay is applied lazily with forward decay (Cormode et al., "Forward Decay: A
+    Practical Time Decay Model for Streaming Systems"): an update at time t is
+    stored scaled up by 2^((t - landmark) / half_life), and queries scale down by
+    the same factor for the current time. Ticks never touch the matrix. The stored
+    values grow over time, so once the landmark is more than `_RENORMALIZE_AFTER`
+    half-lives old, the whole matrix is rescaled and the landmark moved forward.
+    That costs one pass per `_RENORMALIZE_AFTER` half-lives.
+
+    Counters are floats. Sketches with the same half-life can be merged: this
+    sketch is renormalized to the current time, then the other sketch's values are
+    rescaled from its landmark to the new one and added.
+    The landmark is a reading of the sketch's clock, so merging and restoring
+    serialized sketches need clocks on a common timeline (`time.time` across hosts).
+    """
+
+    _TYPECODE = "d"
+    _RENORMALIZE_AFTER = 32  # half-lives
+
+    def __init__(
+        self,
+        width: int = 100,
+        depth: int = 4,
+        hasher: str | Hasher | None = None,
+        conservative: bool = False,
+        seed: int = 0,
+        half_life: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        super().__init__(width, depth, hasher, conservative, seed)
+        self._half_life = half_life
+        self._clock = clock
+        self._landmark = clock()
+
+    def add(self, key: str, count: float = 1):
+        super().add(key, count * self._growth())
+
+    def add_many(self, keys: Iterable[str], counts: Iterable[float] | None = None):
+        growth = self._growth()
+        keys = list(keys)
+        if counts is None:
+            counts = [growth] * len(keys)
+        else:
+            counts = [count * growth for count in counts]
+        super().add_many(keys, counts)
+
+    def frequency(self, key: str, estimator: str = "min") -> float:
+        """The decayed count of the key at the current time. See `CountMinSketch.frequency`."""
+        return self.frequency_many((key,), estimator)[0]
+
+    def frequency_many(
+        self, keys: Iterable[str], estimator: str = "min"
+    ) -> list[float]:
+        decay = 1 / self._growth()
+        return [value * decay for value in super().frequency_many(keys, estimator)]
+
+    def merge(self, other: Self) -> Self:
+        """
+        Add another decaying sketch's counts into this one.
+
+        Both sketches must have the same half-life, and the same width, depth,
+        seed, hasher and update mode.
+        """
+        if not isinstance(other, DecayingCountMinSketch) or (
+            self._half_life != other._half_life
+        ):
+            raise ValueError("sketches must both decay, with the same half_life")
+        # move this landmark to the current time first: an idle sketch's landmark
+        # can be arbitrarily old, and scaling the other sketch up to it overflows
+        self._renormalize()
+        scale = 2 ** ((other._landmark - self._landmark) / self._half_life)
+        rescaled = other.copy()
+        rescaled._matrix = array.array(
+            self._TYPECODE, (value * scale for value in other._matrix)
+        )
+        rescaled._total = other._total * scale
+        return super().merge(rescaled)
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact header followed by the raw float64 matrix."""
+        name = self._hasher.name.encode("utf-8")
+        header = _DECAYING_HEADER.pack(
+            _DECAYING_MAGIC,
+            _DECAYING_FORMAT_VERSION,
+            self._width,
+            self._depth,
+            self._seed,
+            self._total,
+            self._conservative,
+            self._half_life,
+            self._landmark,
+            len(name),
+        )
+        header += name
+        header += bytes(-len(header) % 8)
+
+        matrix = self._matrix
+        if sys.byteorder == "big":
+            matrix = array.array(self._TYPECODE, matrix)
+            matrix.byteswap()
+        return header + matrix.tobytes()
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, clock: Callable[[], float] = time.monotonic
+    ) -> Self:
+        """Deserialize a sketch produced by `to_bytes`, reading time from clock."""
+        if len(data) < _DECAYING_HEADER.size:
+            raise ValueError(
+                "data is too short to be a serialized DecayingCountMinSketch"
+            )
+        (
+            magic,
+            version,
+            width,
+            depth,
+            seed,
+            total,
+            conservative,
+            half_life,
+            landmark,
+            name_len,
+        ) = _DECAYING_HEADER.unpack_from(data)
+        if magic != _DECAYING_MAGIC:
+            raise ValueError("data is not a serialized DecayingCountMinSketch")
+        if version != _DECAYING_FORMAT_VERSION:
+            raise ValueError(
+                f"unsupported DecayingCountMinSketch format version {version}"
+            )
+
+        offset = _DECAYING_HEADER.size + name_len
+        name = bytes(data[_DECAYING_HEADER.size : offset]).decode("utf-8")
+        offset += -offset % 8
+        end = offset + 8 * width * depth
+        if len(data) < end:
+            raise ValueError("data is too short for the DecayingCountMinSketch matrix")
+
+        cms = cls(width, depth, name, conservative, seed, half_life, clock)
+        cms._total = total
+        cms._landmark = landmark
+        cms._matrix = array.array(cls._TYPECODE)
+        cms._matrix.frombytes(data[offset:end])
+        if sys.byteorder == "big":
+            cms._matrix.byteswap()
+        return cms
+
+    def _growth(self) -> float:
+        """The forward-decay scale factor for the current time, 2^(age / half_life)."""
+        age = (self._clock() - self._landmark) / self._half_life
+        if age > self._RENORMALIZE_AFTER:
+            self._renormalize()
+            age = 0
+        return 2**age
+
+    def _renormalize(self):
+        now = self._clock()
+        scale = 2 ** (-(now - self._landmark) / self._half_life)
+        self._matrix = array.array(
+            self._TYPECODE, (value * scale for value in self._matrix)
+        )
+        self._total *= scale
+        self._landmark = now
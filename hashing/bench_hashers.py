@@ -0,0 +1,56 @@
+"""
+Throughput of each hash backend, on its own and inside each sketch.
+
+Run with:
+    python -m hashing.bench_hashers [--items N]
+"""
+
+import argparse
+import time
+
+from bloom_filter.bloom_filter import BloomFilter
+from consistent_hash.consistent_hashing import ConsistentHashRing
+from count_min_sketch.count_min_sketch import CountMinSketch
+from hyperloglog.hll import HyperLogLog
+
+from .hashers import available_hashers, get_hasher
+
+
+def _ops_per_sec(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    args = parser.parse_args()
+
+    keys = [f"user:{i}" for i in range(args.items)]
+    encoded = [key.encode("utf-8") for key in keys]
+
+    print(
+        f"{'backend':<12} {'raw':>12} {'bloom.add':>12} {'cms.add':>12} "
+        f"{'hll.add':>12} {'ring.get':>12}   (ops/sec)"
+    )
+    for name in available_hashers():
+        hasher = get_hasher(name)
+        bloom = BloomFilter(expected_items=args.items, hasher=name)
+        cms = CountMinSketch(width=2_000, depth=4, hasher=name)
+        hll = HyperLogLog(precision=14, hasher=name)
+        ring = ConsistentHashRing(nodes=["a", "b", "c", "d"], hasher=name)
+
+        print(
+            f"{name:<12}"
+            f" {_ops_per_sec(hasher.hash, encoded):>12,.0f}"
+            f" {_ops_per_sec(bloom.add, keys):>12,.0f}"
+            f" {_ops_per_sec(cms.add, keys):>12,.0f}"
+            f" {_ops_per_sec(hll.add, keys):>12,.0f}"
+            f" {_ops_per_sec(ring.get_node, keys):>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
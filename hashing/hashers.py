@@ -0,0 +1,110 @@
+import hashlib
+from typing import Callable, NamedTuple
+
+# Optional accelerated backends. The hashlib backends are always available; these
+# are only registered when the corresponding package is installed.
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import mmh3
+except ImportError:
+    mmh3 = None
+
+
+DEFAULT_HASHER = "sha256"
+
+
+class Hasher(NamedTuple):
+    """
+    A named hash backend that maps bytes to a fixed-width unsigned integer.
+
+    Attributes:
+        name (str): The registry name of the backend.
+        bits (int): The width of the produced hash values, in bits.
+        digest (Callable[[bytes], bytes]): Returns the raw digest of the input.
+    """
+
+    name: str
+    bits: int
+    digest: Callable[[bytes], bytes]
+
+    def hash(self, data: bytes) -> int:
+        """Return the digest of `data` as an unsigned big-endian integer."""
+        return int.from_bytes(self.digest(data), "big")
+
+    def hash_pair(self, data: bytes) -> tuple[int, int]:
+        """
+        Split the digest of `data` into two independent halves.
+
+        This is the pair of base hashes used for double hashing
+        (h_i = h1 + i * h2), so a single digest can stand in for many hash functions.
+
+        Args:
+            data (bytes): The input to hash.
+
+        Returns:
+            tuple[int, int]: The high and low halves of the digest.
+        """
+        half = self.bits // 2
+        value = int.from_bytes(self.digest(data), "big")
+        return value >> half, value & ((1 << half) - 1)
+
+
+def _sha256_digest(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()
+
+
+def _md5_digest(data: bytes) -> bytes:
+    return hashlib.md5(data).digest()
+
+
+def _blake2b_digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+_HASHERS: dict[str, Hasher] = {
+    "sha256": Hasher("sha256", 256, _sha256_digest),
+    "md5": Hasher("md5", 128, _md5_digest),
+    "blake2b": Hasher("blake2b", 128, _blake2b_digest),
+}
+
+if xxhash is not None:
+    _HASHERS["xxh64"] = Hasher("xxh64", 64, xxhash.xxh64_digest)
+    _HASHERS["xxh3_128"] = Hasher("xxh3_128", 128, xxhash.xxh3_128_digest)
+
+if mmh3 is not None:
+    _HASHERS["murmur3_128"] = Hasher("murmur3_128", 128, mmh3.hash_bytes)
+
+
+def available_hashers() -> list[str]:
+    """Return the names of the hash backends usable in this environment."""
+    return list(_HASHERS)
+
+
+def get_hasher(hasher: str | Hasher | None = None) -> Hasher:
+    """
+    Resolve a hasher argument to a `Hasher`.
+
+    Args:
+        hasher (str | Hasher | None): A backend name, a `Hasher` instance, or None
+            for the default (sha256) backend.
+
+    Returns:
+        Hasher: The resolved backend.
+
+    Raises:
+        ValueError: If the name is not a known backend or its package is not installed.
+    """
+    if hasher is None:
+        hasher = DEFAULT_HASHER
+    if isinstance(hasher, Hasher):
+        return hasher
+    try:
+        return _HASHERS[hasher]
+    except KeyError:
+        raise ValueError(
+            f"unknown hasher {hasher!r}, expected one of {available_hashers()}"
+        ) from None
@@ -0,0 +1,53 @@
+import hashlib
+import pickle
+
+import pytest
+
+from .hashers import Hasher, available_hashers, get_hasher
+
+
+def test_stdlib_backends_are_always_available():
+    names = available_hashers()
+    assert "sha256" in names
+    assert "md5" in names
+    assert "blake2b" in names
+
+
+def test_default_hasher_is_sha256():
+    assert get_hasher().name == "sha256"
+    assert get_hasher(None).name == "sha256"
+
+
+def test_sha256_matches_hexdigest_round_trip():
+    hasher = get_hasher("sha256")
+    data = b"foo"
+    assert hasher.hash(data) == int(hashlib.sha256(data).hexdigest(), 16)
+
+
+def test_hash_width_matches_bits():
+    for name in available_hashers():
+        hasher = get_hasher(name)
+        assert hasher.hash(b"some key") < (1 << hasher.bits)
+        assert len(hasher.digest(b"some key")) * 8 == hasher.bits
+
+
+def test_hash_pair_splits_digest_in_halves():
+    hasher = get_hasher("blake2b")
+    high, low = hasher.hash_pair(b"foo")
+    assert (high << 64) | low == hasher.hash(b"foo")
+
+
+def test_get_hasher_passes_through_instances():
+    custom = Hasher("custom", 128, lambda data: hashlib.md5(data).digest())
+    assert get_hasher(custom) is custom
+
+
+def test_unknown_hasher_raises_error():
+    with pytest.raises(ValueError, match="unknown hasher"):
+        get_hasher("crc32")
+
+
+def test_registered_hashers_are_picklable():
+    for name in available_hashers():
+        hasher = get_hasher(name)
+        assert pickle.loads(pickle.dumps(hasher)).hash(b"x") == hasher.hash(b"x")
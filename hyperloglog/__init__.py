@@ -0,0 +1,2 @@
+from .hll import HyperLogLog, intersection_cardinality, union_cardinality
+from .parallel import hll_from_file
@@ -1,5 +1,18 @@
-import hashlib
+import copy
+import itertools
 import math
+import struct
+from typing import Iterable, Self
+
+from hashing.hashers import Hasher, get_hasher
+
+# Serialized layout: a fixed header, the hasher name, then either the registers
+# packed 6 bits each (4 registers per 3 bytes, as Redis does) or, for a sparse
+# HyperLogLogPlusPlus, its encoded sparse registers as little-endian uint32.
+_MAGIC = b"HLLS"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHBBBH")  # magic, version, kind, precision, sparse, name len
+_REGISTER_MAX = (1 << 6) - 1
 
 
 class HyperLogLog:
@@ -16,19 +29,53 @@ class HyperLogLog:
     - https://algo.inria.fr/flajolet/Publications/FlFuGaMe07.pdf
     - https://stackoverflow.com/questions/12327004/how-does-the-hyperloglog-algorithm-work
     - https://www.geeksforgeeks.org/system-design/hyperloglog-algorithm-in-system-design/
+
+    Sketches with the same precision and hasher can be merged by taking the
+    register-wise maximum, which gives exactly the sketch of the union of their
+    streams.
+
+    The estimator's inputs, the number of zero registers and the harmonic sum
+    sum(2^-register), are kept up to date whenever a register grows, so
+    `cardinality` is O(1) rather than a pass over every register. The harmonic sum
+    is kept exactly, as an integer scaled by 2^_MAX_REGISTER, so it does not drift
+    however many updates it absorbs.
     """
 
-    def __init__(self, precision=4):
+    _KIND = 0  # identifies the class in serialized sketches
+    _MAX_REGISTER = 255
+
+    def __init__(self, precision=4, hasher: str | Hasher | None = None):
         self._precision = precision
         self._num_buckets = 1 << precision
+        self._hasher = get_hasher(hasher)
+        self._init_registers()
+
+    def _init_registers(self) -> None:
+        """Allocate empty registers, whose counts are known without a recount."""
         self._buckets = bytearray(self._num_buckets)
+        self._zero_buckets = self._num_buckets
+        self._inverse_sum = self._num_buckets << self._MAX_REGISTER
+
+    def _recount(self) -> None:
+        """Recompute the zero-register count and harmonic sum from the registers."""
+        self._zero_buckets = self._buckets.count(0)
+        self._inverse_sum = sum(
+            count << (self._MAX_REGISTER - register)
+            for register, count in enumerate(self._register_histogram())
+        )
+
+    def _register_histogram(self) -> list[int]:
+        histogram = [0] * (self._MAX_REGISTER + 1)
+        for register in self._buckets:
+            histogram[register] += 1
+        return histogram
 
     def _hash(self, item: str | bytes) -> int:
         if isinstance(item, str):
             encoded_item = item.encode("utf-8")
         else:
             encoded_item = item
-        return int(hashlib.sha256(encoded_item).hexdigest(), 16)
+        return self._hasher.hash(encoded_item)
 
     def _leading_zeros(self, hash_val: int, max_bits: int = 64):
         # This is more efficient than looping.
@@ -40,19 +87,19 @@ class HyperLogLog:
 
     @property
     def cardinality(self) -> int:
-        if all(bucket == 0 for bucket in self._buckets):
+        if self._zero_buckets == self._num_buckets:
             return 0
 
         # basic hll formula alpha * m^2 / sum(2^(-bucket_value))
         raw_est = (
             self._alpha()
             * (self._num_buckets**2)
-            / sum(2 ** (-bucket) for bucket in self._buckets)
+            / (self._inverse_sum / (1 << self._MAX_REGISTER))
         )
 
         # Small range correction from the paper
         if raw_est <= 2.5 * self._num_buckets:
-            zero_buckets = self._buckets.count(0)
+            zero_buckets = self._zero_buckets
             if zero_buckets != 0:
                 # LinearCounting
                 return int(
@@ -86,9 +133,172 @@ class HyperLogLog:
 
         # use remaining bits to count leading zeros
         remaining_bits = hash_val >> self._precision
-        leading_zeros = self._leading_zeros(remaining_bits, 256 - self._precision)
+        leading_zeros = self._leading_zeros(
+            remaining_bits, self._hasher.bits - self._precision
+        )
 
-        clamped_zeros = min(leading_zeros, 255)
+        clamped_zeros = min(leading_zeros, self._MAX_REGISTER)
 
         # update bucket with max leading zeros seen
-        self._buckets[bucket_index] = max(self._buckets[bucket_index], clamped_zeros)
+        old = self._buckets[bucket_index]
+        if clamped_zeros > old:
+            self._buckets[bucket_index] = clamped_zeros
+            if old == 0:
+                self._zero_buckets -= 1
+            self._inverse_sum += (1 << (self._MAX_REGISTER - clamped_zeros)) - (
+                1 << (self._MAX_REGISTER - old)
+            )
+
+    def add_many(self, items: Iterable[str | bytes]) -> None:
+        """
+        Add many items in one pass.
+
+        Same result as calling `add` for each item, with the hashing and register
+        updates inlined and the estimator state written back once at the end.
+        """
+        digest = self._hasher.digest
+        from_bytes = int.from_bytes
+        precision = self._precision
+        index_mask = (1 << precision) - 1
+        rest_bits = self._hasher.bits - precision
+        max_register = self._MAX_REGISTER
+        buckets = self._buckets
+        zero_buckets = self._zero_buckets
+        inverse_sum = self._inverse_sum
+
+        try:
+            for item in items:
+                if isinstance(item, str):
+                    item = item.encode("utf-8")
+                hash_val = from_bytes(digest(item), "big")
+                index = hash_val & index_mask
+                rho = min(
+                    rest_bits - (hash_val >> precision).bit_length() + 1, max_register
+                )
+                old = buckets[index]
+                if rho > old:
+                    buckets[index] = rho
+                    if old == 0:
+                        zero_buckets -= 1
+                    inverse_sum += (1 << (max_register - rho)) - (
+                        1 << (max_register - old)
+                    )
+        finally:
+            self._zero_buckets = zero_buckets
+            self._inverse_sum = inverse_sum
+
+    def merge(self, other: Self) -> Self:
+        """
+        Merge another sketch into this one, so it estimates the union of both streams.
+
+        Both sketches must be of the same type, with the same precision and hasher.
+        """
+        self._check_compatible(other)
+        self._buckets = bytearray(map(max, self._buckets, other._buckets))
+        self._recount()
+        return self
+
+    def _check_compatible(self, other: Self) -> None:
+        if (
+            type(self) is not type(other)
+            or self._precision != other._precision
+            or self._hasher.name != other._hasher.name
+        ):
+            raise ValueError("sketches must share type, precision and hasher")
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the sketch, packing each register into 6 bits.
+
+        Registers above 63 are clamped to 63. That needs 63 leading zeros in a
+        hash, which will not happen in practice.
+        """
+        return self._header(sparse=False) + _pack_registers(self._buckets)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Self:
+        """Deserialize a sketch produced by `to_bytes`."""
+        if len(data) < _HEADER.size:
+            raise ValueError(f"data is too short to be a serialized {cls.__name__}")
+        magic, version, kind, precision, sparse, name_len = _HEADER.unpack_from(data)
+        if magic != _MAGIC or kind != cls._KIND:
+            raise ValueError(f"data is not a serialized {cls.__name__}")
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"unsupported {cls.__name__} format version {version}")
+
+        offset = _HEADER.size + name_len
+        name = bytes(data[_HEADER.size : offset]).decode("utf-8")
+        hll = cls(precision, name)
+        hll._load_payload(memoryview(data)[offset:], bool(sparse))
+        return hll
+
+    def _header(self, sparse: bool) -> bytes:
+        name = self._hasher.name.encode("utf-8")
+        header = _HEADER.pack(
+            _MAGIC, _FORMAT_VERSION, self._KIND, self._precision, sparse, len(name)
+        )
+        return header + name
+
+    def _load_payload(self, payload: memoryview, sparse: bool) -> None:
+        self._buckets = _unpack_registers(payload, self._num_buckets)
+        self._recount()
+
+
+def union_cardinality(*hlls: HyperLogLog) -> int:
+    """
+    Estimate the number of distinct items across all the given sketches.
+
+    None of the sketches is modified.
+    """
+    if not hlls:
+        return 0
+    union = copy.deepcopy(hlls[0])
+    for hll in hlls[1:]:
+        union.merge(hll)
+    return union.cardinality
+
+
+def intersection_cardinality(*hlls: HyperLogLog) -> int:
+    """
+    Estimate the number of items present in every given sketch.
+
+    Uses inclusion-exclusion over the union estimates of every non-empty subset:
+        |A n B| = |A| + |B| - |A u B|
+    This needs 2^n - 1 unions for n sketches. The errors of all those estimates add
+    up, so the result is only meaningful when the intersection is a sizeable share
+    of the union. Negative estimates are clamped to 0.
+    """
+    if not hlls:
+        return 0
+    total = 0
+    for size in range(1, len(hlls) + 1):
+        sign = 1 if size % 2 else -1
+        for subset in itertools.combinations(hlls, size):
+            total += sign * union_cardinality(*subset)
+    return max(0, total)
+
+
+def _pack_registers(registers: bytes) -> bytes:
+    """Pack registers into 6 bits each, 4 registers per 3 bytes, little-endian."""
+    packed = bytearray()
+    for i in range(0, len(registers), 4):
+        group = 0
+        for shift, register in enumerate(registers[i : i + 4]):
+            group |= min(register, _REGISTER_MAX) << (6 * shift)
+        packed += group.to_bytes(3, "little")
+    return bytes(packed)
+
+
+def _unpack_registers(data: bytes, num_registers: int) -> bytearray:
+    """Inverse of `_pack_registers`."""
+    expected = 3 * ((num_registers + 3) // 4)
+    if len(data) < expected:
+        raise ValueError("data is too short for the HyperLogLog registers")
+
+    registers = bytearray(num_registers)
+    for i in range(0, num_registers, 4):
+        group = int.from_bytes(data[3 * (i // 4) : 3 * (i // 4) + 3], "little")
+        for j in range(i, min(i + 4, num_registers)):
+            registers[j] = group & _REGISTER_MAX
+            group >>= 6
+    return registers
@@ -0,0 +1,103 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+from hashing.hashers import Hasher
+
+from .hll import HyperLogLog
+
+
+def hll_from_file(
+    path: str | os.PathLike,
+    precision: int = 14,
+    workers: int | None = None,
+    hasher: str | Hasher | None = None,
+    cls: type[HyperLogLog] = HyperLogLog,
+    chunk_size: int = 16 * 1024 * 1024,
+) -> HyperLogLog:
+    """
+    Build a sketch of the distinct lines of a file using a pool of worker processes.
+
+    The file is split into byte ranges of about `chunk_size` bytes, each ending on a
+    line boundary. Every worker memory-maps the file, adds the lines of one range to
+    a partial sketch and returns it serialized. The partial sketches are merged into
+    the result, which is identical to adding every line to one sketch. The ranges
+    need no coordination, so throughput grows with the number of cores until the
+    disk becomes the bottleneck.
+
+    Each line is one item, as bytes without its line ending. Empty lines are skipped.
+
+    Args:
+        path: The file to read.
+        precision: The precision of the sketch.
+        workers: The number of processes, defaulting to the CPU count.
+        hasher: The hash backend to use.
+        cls: The sketch class, HyperLogLog or a subclass such as HyperLogLogPlusPlus.
+        chunk_size: The approximate number of bytes sent to a worker at a time.
+    """
+    if not (isinstance(chunk_size, int) and chunk_size > 0):
+        raise ValueError("chunk_size must be a positive integer")
+
+    result = cls(precision, hasher)
+    ranges = list(_line_ranges(path, chunk_size))
+    if not ranges:
+        return result
+
+    workers = workers or os.cpu_count() or 1
+    params = (precision, hasher)
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        futures = [
+            executor.submit(_build_partial, cls, params, path, start, end)
+            for start, end in ranges
+        ]
+        for future in futures:
+            result.merge(cls.from_bytes(future.result()))
+    return result
+
+
+def _line_ranges(path: str | os.PathLike, chunk_size: int) -> Iterator[tuple[int, int]]:
+    """Split a file into (start, end) byte ranges that each end after a newline."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return None
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            newline = mm.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            yield start, end
+            start = end
+
+
+def _build_partial(
+    cls: type[HyperLogLog],
+    params: tuple,
+    path: str | os.PathLike,
+    start: int,
+    end: int,
+) -> bytes:
+    """Worker for `hll_from_file`: sketches the lines of one range and serializes it."""
+    hll = cls(*params)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        hll.add_many(_lines(mm, start, end))
+    return hll.to_bytes()
+
+
+def _lines(mm: mmap.mmap, start: int, end: int) -> Iterator[bytes]:
+    """Yield the non-empty lines of mm[start:end], without their line endings.
+
+    Lines end at a newline, and a carriage return just before it is dropped. The
+    range is scanned in place, so only one line is copied at a time.
+    """
+    pos = start
+    while pos < end:
+        newline = mm.find(b"\n", pos, end)
+        if newline == -1:
+            newline = end
+        line = mm[pos:newline]
+        pos = newline + 1
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        if line:
+            yield line
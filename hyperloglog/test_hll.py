@@ -1,4 +1,4 @@
-from .hll import HyperLogLog
+from .hll import HyperLogLog, intersection_cardinality, union_cardinality
 import pytest
 
 
@@ -12,6 +12,13 @@ def test_estimates_cardinality_of_empty_set():
     assert hll.cardinality == 0
 
 
+def test_new_sketch_counts_match_a_recount():
+    hll = HyperLogLog(10)
+    zero_buckets, inverse_sum = hll._zero_buckets, hll._inverse_sum
+    hll._recount()
+    assert (hll._zero_buckets, hll._inverse_sum) == (zero_buckets, inverse_sum)
+
+
 def test_can_add_item_and_estimate_cardinality():
     hll = HyperLogLog()
     hll.add("foo")
@@ -100,3 +107,93 @@ def test_add_bytes():
     hll.add(b"foo")
     cardinality = hll.cardinality
     assert cardinality == pytest.approx(1, abs=1)
+
+
+def test_can_create_with_hasher_param():
+    for hasher in ("sha256", "blake2b", "md5"):
+        hll = HyperLogLog(precision=10, hasher=hasher)
+        for i in range(10_000):
+            hll.add(f"item:{i}")
+        assert hll.cardinality == pytest.approx(10_000, rel=0.1)
+
+
+def _hll_of(items, precision=10) -> HyperLogLog:
+    hll = HyperLogLog(precision=precision)
+    for item in items:
+        hll.add(item)
+    return hll
+
+
+def test_merge_equals_sketch_of_union():
+    left_items = [f"item:{i}" for i in range(0, 6_000)]
+    right_items = [f"item:{i}" for i in range(4_000, 10_000)]
+
+    merged = _hll_of(left_items).merge(_hll_of(right_items))
+    union = _hll_of(left_items + right_items)
+
+    assert merged._buckets == union._buckets
+    assert merged.cardinality == pytest.approx(10_000, rel=0.1)
+
+
+def test_merge_requires_matching_sketches():
+    with pytest.raises(ValueError, match="must share"):
+        HyperLogLog(precision=4).merge(HyperLogLog(precision=5))
+    with pytest.raises(ValueError, match="must share"):
+        HyperLogLog().merge(HyperLogLog(hasher="md5"))
+
+
+def test_union_cardinality_does_not_modify_inputs():
+    hourly = [_hll_of(f"user:{h * 1_000 + i}" for i in range(2_000)) for h in range(3)]
+    before = [bytes(hll._buckets) for hll in hourly]
+
+    assert union_cardinality(*hourly) == pytest.approx(4_000, rel=0.1)
+    assert [bytes(hll._buckets) for hll in hourly] == before
+    assert union_cardinality() == 0
+
+
+def test_intersection_cardinality():
+    left = _hll_of(f"item:{i}" for i in range(0, 20_000))
+    right = _hll_of(f"item:{i}" for i in range(10_000, 30_000))
+    assert intersection_cardinality(left, right) == pytest.approx(10_000, rel=0.25)
+    assert intersection_cardinality(left) == left.cardinality
+
+
+def test_to_bytes_round_trip():
+    hll = _hll_of((f"item:{i}" for i in range(5_000)), precision=12)
+    data = hll.to_bytes()
+
+    # 6 bits per register
+    assert len(data) < (1 << 12) * 6 // 8 + 32
+
+    restored = HyperLogLog.from_bytes(data)
+    assert restored._buckets == hll._buckets
+    assert restored.cardinality == hll.cardinality
+    assert restored._hasher.name == hll._hasher.name
+
+
+def test_from_bytes_rejects_invalid_data():
+    with pytest.raises(ValueError, match="too short"):
+        HyperLogLog.from_bytes(b"HLL")
+    with pytest.raises(ValueError, match="not a serialized HyperLogLog"):
+        HyperLogLog.from_bytes(b"x" * 32)
+    with pytest.raises(ValueError, match="too short"):
+        HyperLogLog.from_bytes(HyperLogLog().to_bytes()[:-3])
+
+
+def test_add_many_matches_add():
+    items = [f"item:{i % 3_000}" for i in range(10_000)]
+    one_by_one = _hll_of(items, precision=10)
+    bulk = HyperLogLog(precision=10)
+    bulk.add_many(items)
+
+    assert bulk._buckets == one_by_one._buckets
+    assert bulk.cardinality == one_by_one.cardinality
+
+
+def test_incremental_estimator_state_matches_recount():
+    hll = HyperLogLog(precision=12)
+    hll.add_many(f"item:{i}" for i in range(20_000))
+    zero_buckets, inverse_sum = hll._zero_buckets, hll._inverse_sum
+
+    hll._recount()
+    assert (hll._zero_buckets, hll._inverse_sum) == (zero_buckets, inverse_sum)
@@ -0,0 +1,168 @@
+import pytest
+
+from .hll import HyperLogLog
+from .hll_plus_plus import HyperLogLogPlusPlus
+
+
+def test_empty_set_has_zero_cardinality():
+    hll = HyperLogLogPlusPlus()
+    assert hll.cardinality == 0
+    assert hll.is_sparse
+
+
+def test_new_and_restored_sparse_sketches_allocate_no_registers(monkeypatch):
+    def recount(self):
+        raise AssertionError("a sparse sketch should not walk dense registers")
+
+    monkeypatch.setattr(HyperLogLogPlusPlus, "_recount", recount)
+    hll = HyperLogLogPlusPlus(18)
+    hll.add_many(["foo", "bar"])
+    restored = HyperLogLogPlusPlus.from_bytes(hll.to_bytes())
+    assert hll._buckets is None and restored._buckets is None
+    assert restored.cardinality == 2
+
+
+def test_small_cardinalities_are_nearly_exact_in_sparse_mode():
+    hll = HyperLogLogPlusPlus(precision=14)
+    added = 0
+    for n in (1, 10, 100, 1_000):
+        for i in range(added, n):
+            hll.add(f"item:{i}")
+        added = n
+        assert hll.cardinality == pytest.approx(n, abs=1)
+        assert hll.is_sparse
+
+
+def test_duplicates_do_not_increase_cardinality():
+    hll = HyperLogLogPlusPlus()
+    for _ in range(1_000):
+        hll.add("foo")
+    hll.add(b"foo")
+    assert hll.cardinality == 1
+
+
+def test_converts_to_dense_when_sparse_grows():
+    hll = HyperLogLogPlusPlus(precision=10)
+    for i in range(5_000):
+        hll.add(f"item:{i}")
+    hll._merge_sparse_buffer()
+
+    assert not hll.is_sparse
+    assert len(hll._buckets) == 1 << 10
+    assert len(hll._sparse) == 0
+
+
+def test_sparse_uses_less_memory_than_dense():
+    hll = HyperLogLogPlusPlus(precision=14)
+    for i in range(100):
+        hll.add(f"item:{i}")
+    hll._merge_sparse_buffer()
+    assert hll._sparse.itemsize * len(hll._sparse) < (1 << 14) / 10
+
+
+@pytest.mark.parametrize("num_items", [5_000, 20_000, 100_000])
+def test_dense_cardinality_accuracy(num_items):
+    hll = HyperLogLogPlusPlus(precision=12)
+    for i in range(num_items):
+        hll.add(f"item:{i}")
+
+    # standard error is 1.04 / sqrt(2^12) = 1.6%
+    assert hll.cardinality == pytest.approx(num_items, rel=0.05)
+
+
+def test_conversion_preserves_registers():
+    sparse = HyperLogLogPlusPlus(precision=8)
+    dense = HyperLogLogPlusPlus(precision=8)
+    dense._convert_to_dense()
+
+    for i in range(50):
+        sparse.add(f"item:{i}")
+        dense.add(f"item:{i}")
+    sparse._merge_sparse_buffer()
+    sparse._convert_to_dense()
+
+    assert sparse._buckets == dense._buckets
+
+
+def test_invalid_precision_raises_error():
+    with pytest.raises(ValueError, match="precision must be"):
+        HyperLogLogPlusPlus(precision=3)
+    with pytest.raises(ValueError, match="precision must be"):
+        HyperLogLogPlusPlus(precision=19)
+
+
+def _hll_of(items, precision=12) -> HyperLogLogPlusPlus:
+    hll = HyperLogLogPlusPlus(precision=precision)
+    for item in items:
+        hll.add(item)
+    return hll
+
+
+@pytest.mark.parametrize(
+    "left_size, right_size",
+    [(100, 100), (100, 50_000), (50_000, 100), (20_000, 30_000)],
+)
+def test_merge_equals_sketch_of_union(left_size, right_size):
+    left_items = [f"left:{i}" for i in range(left_size)]
+    right_items = [f"right:{i}" for i in range(right_size)]
+
+    merged = _hll_of(left_items).merge(_hll_of(right_items))
+    union = _hll_of(left_items + right_items)
+
+    assert merged.is_sparse == union.is_sparse
+    assert merged.cardinality == union.cardinality
+    assert merged.to_bytes() == union.to_bytes()
+
+
+def test_merge_rejects_plain_hyperloglog():
+    with pytest.raises(ValueError, match="must share"):
+        HyperLogLogPlusPlus(precision=10).merge(HyperLogLog(precision=10))
+
+
+@pytest.mark.parametrize("num_items", [0, 100, 50_000])
+def test_to_bytes_round_trip(num_items):
+    hll = _hll_of(f"item:{i}" for i in range(num_items))
+    restored = HyperLogLogPlusPlus.from_bytes(hll.to_bytes())
+
+    assert restored.is_sparse == hll.is_sparse
+    assert restored.cardinality == hll.cardinality
+    restored.add("new item")
+    assert restored.cardinality >= hll.cardinality
+
+
+def test_from_bytes_rejects_other_kinds():
+    with pytest.raises(ValueError, match="not a serialized HyperLogLogPlusPlus"):
+        HyperLogLogPlusPlus.from_bytes(HyperLogLog(precision=12).to_bytes())
+
+
+@pytest.mark.parametrize("num_items", [100, 50_000])
+def test_add_many_matches_add(num_items):
+    items = [f"item:{i}" for i in range(num_items)]
+    one_by_one = _hll_of(items)
+    bulk = HyperLogLogPlusPlus(precision=12)
+    bulk.add_many(items)
+
+    assert bulk.is_sparse == one_by_one.is_sparse
+    assert bulk.cardinality == one_by_one.cardinality
+    assert bulk.to_bytes() == one_by_one.to_bytes()
+
+
+def test_sparse_cardinality_counts_buffered_items():
+    hll = HyperLogLogPlusPlus(precision=14)
+    for i in range(50):
+        hll.add(f"item:{i}")
+    assert hll._sparse_buffer
+    estimate = hll.cardinality
+
+    hll._merge_sparse_buffer()
+    assert hll.cardinality == estimate == 50
+
+
+def test_incremental_histogram_matches_recount():
+    hll = HyperLogLogPlusPlus(precision=16)
+    hll.add_many(f"item:{i}" for i in range(100_000))
+    assert not hll.is_sparse
+    histogram = list(hll._histogram)
+
+    hll._recount()
+    assert hll._histogram == histogram
@@ -0,0 +1,49 @@
+import pytest
+
+from .hll import HyperLogLog
+from .hll_plus_plus import HyperLogLogPlusPlus
+from .parallel import hll_from_file
+
+
+def _write_lines(path, lines, newline="\n"):
+    path.write_bytes(newline.join(lines).encode("utf-8"))
+    return path
+
+
+@pytest.mark.parametrize("cls", [HyperLogLog, HyperLogLogPlusPlus])
+def test_matches_serial_build(tmp_path, cls):
+    lines = [f"user:{i % 4_000}" for i in range(10_000)]
+    path = _write_lines(tmp_path / "users.log", lines)
+
+    serial = cls(precision=12)
+    serial.add_many(lines)
+
+    # a tiny chunk size splits the file into many ranges, most of them mid-line
+    parallel = hll_from_file(path, precision=12, workers=2, cls=cls, chunk_size=997)
+    assert type(parallel) is cls
+    assert parallel.to_bytes() == serial.to_bytes()
+    assert parallel.cardinality == serial.cardinality
+
+
+def test_strips_line_endings_and_skips_empty_lines(tmp_path):
+    path = _write_lines(tmp_path / "users.log", ["a", "b", "", "a", "c"], "\r\n")
+    hll = hll_from_file(path, precision=10, workers=1)
+    assert hll.cardinality == 3
+
+
+def test_bare_carriage_returns_stay_inside_lines(tmp_path):
+    path = tmp_path / "users.log"
+    path.write_bytes(b"a\rb\na\nb\r\n")
+    hll = hll_from_file(path, precision=10, workers=1)
+    assert hll.cardinality == 3
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.log"
+    path.write_bytes(b"")
+    assert hll_from_file(path, precision=10).cardinality == 0
+
+
+def test_rejects_invalid_chunk_size(tmp_path):
+    with pytest.raises(ValueError, match="chunk_size"):
+        hll_from_file(tmp_path / "missing.log", chunk_size=0)
@@ -0,0 +1,2 @@
+from .lsm_tree import LSMTree, merge_entries
+from .sstable import Entry, SSTable
@@ -0,0 +1,44 @@
+"""
+Write throughput of LSMTree under each write-ahead log sync policy.
+
+Run with:
+    python -m lsm_tree.bench_lsm_tree [--writes N]
+"""
+
+import argparse
+import tempfile
+import time
+
+from .lsm_tree import LSMTree
+from .wal import WriteAheadLog
+
+
+def _rate(n: int, start: float) -> float:
+    return n / (time.perf_counter() - start)
+
+
+def wal(writes: int, memtable_size_limit: int) -> None:
+    """Puts per second with every write logged, for each sync policy."""
+    print(f"writes={writes:,} memtable_size_limit={memtable_size_limit:,}")
+    print(f"{'sync':<8} {'writes/s':>12}")
+    for sync in WriteAheadLog.SYNC_POLICIES:
+        with tempfile.TemporaryDirectory() as directory:
+            lsm = LSMTree(memtable_size_limit, directory, sync=sync)
+            start = time.perf_counter()
+            for i in range(writes):
+                lsm.put(f"key:{i}", f"value:{i}")
+            lsm.close()
+            print(f"{sync:<8} {_rate(writes, start):>12,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writes", type=int, default=20_000)
+    parser.add_argument("--memtable-size-limit", type=int, default=1_000)
+    args = parser.parse_args()
+
+    wal(args.writes, args.memtable_size_limit)
+
+
+if __name__ == "__main__":
+    main()
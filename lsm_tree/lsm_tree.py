@@ -1,23 +1,100 @@
-from typing import Optional, NamedTuple
+import heapq
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional
 
-
-class Entry(NamedTuple):
-    key: str
-    value: str
-    sequence: int
+from .sstable import Entry, SSTable, fsync_directory
+from .wal import WriteAheadLog
 
 
 class LSMTree:
-    TOMBSTONE = "<deleted>"
+    """
+    Log-structured merge tree of string keys and values.
+
+    Writes go to an in-memory memtable. When it fills up it is flushed to an
+    immutable, key-sorted SSTable file in `directory`, named by an increasing
+    table number. Opening a tree on an existing directory picks up its tables.
+    Without a directory the tables go to a temporary directory that `close`
+    removes.
+
+    Every write is appended to a write-ahead log before it reaches the memtable,
+    and the log is replayed on open, so unflushed writes survive a crash. The log
+    is emptied after each flush. `sync`, `group_records` and `group_interval`
+    pick how often it is fsynced; see `WriteAheadLog`. `sync` defaults to
+    "always", or to "none" for a temporary directory, which does not outlive the
+    tree anyway.
+    """
 
-    def __init__(self, memtable_size_limit=10):
+    TOMBSTONE = "<deleted>"
+    SSTABLE_SUFFIX = ".sst"
+    WAL_NAME = "wal.log"
+
+    def __init__(
+        self,
+        memtable_size_limit=10,
+        directory: Optional[str | os.PathLike] = None,
+        sync: Optional[str] = None,
+        group_records: int = 100,
+        group_interval: float = 0.01,
+    ):
         self.memtable_size_limit = memtable_size_limit
         self._memtable: dict[str, Entry] = dict()
-        self.sstables: list[list[Entry]] = []
-        self.next_seq = 1
+        self._temp_dir = None
+        if directory is None:
+            self._temp_dir = tempfile.TemporaryDirectory(prefix="lsm-")
+            directory = self._temp_dir.name
+        if sync is None:
+            sync = "always" if self._temp_dir is None else "none"
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        for name in os.listdir(directory):
+            # a table whose write was interrupted before it was renamed into place
+            if name.endswith(self.SSTABLE_SUFFIX + ".tmp"):
+                os.remove(os.path.join(directory, name))
+
+        self.sstables: list[SSTable] = [
+            SSTable(os.path.join(directory, name))
+            for name in sorted(os.listdir(directory))
+            if name.endswith(self.SSTABLE_SUFFIX)
+        ]
+        self.next_seq = 1 + max((t.max_sequence for t in self.sstables), default=0)
+        # how many SSTables `get` has read from, and ruled out without reading
+        self.sstables_probed = 0
+        self.sstables_skipped = 0
+        self._next_table = 1 + max(
+            (self._table_number(t) for t in self.sstables), default=0
+        )
+
+        self.wal, entries = WriteAheadLog.open(
+            os.path.join(directory, self.WAL_NAME),
+            sync=sync,
+            group_records=group_records,
+            group_interval=group_interval,
+        )
+        for entry in entries:
+            self._memtable[entry.key] = entry
+            self.next_seq = max(self.next_seq, entry.sequence + 1)
+        if len(self._memtable) >= self.memtable_size_limit:
+            self._flush_memtable()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        """Flush the memtable and release the log and the SSTables."""
+        self._flush_memtable()
+        self.wal.close()
+        for sstable in self.sstables:
+            sstable.close()
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
 
     def put(self, key: str, val: str) -> None:
         entry = Entry(key, val, self.next_seq)
+        self.wal.append(entry)
         self._memtable[key] = entry
         self.next_seq += 1
 
@@ -33,12 +110,12 @@ class LSMTree:
             return None if entry.value == self.TOMBSTONE else entry.value
 
         for sstable in reversed(self.sstables):
-            latest_entry = None
-
-            for entry in reversed(sstable):
-                if entry.key == key:
-                    latest_entry = entry
-                    break
+            # fences and Bloom filter rule out most tables without reading a block
+            if not sstable.might_contain(key):
+                self.sstables_skipped += 1
+                continue
+            self.sstables_probed += 1
+            latest_entry = sstable.get(key)
 
             if latest_entry:
                 return (
@@ -49,6 +126,7 @@ class LSMTree:
 
     def delete(self, key: str) -> None:
         entry = Entry(key, self.TOMBSTONE, self.next_seq)
+        self.wal.append(entry)
         self._memtable[key] = entry
         self.next_seq += 1
 
@@ -56,68 +134,94 @@ class LSMTree:
             self._flush_memtable()
 
     def compact(self) -> None:
+        """Merge every SSTable into one, keeping the newest entry per key."""
         if len(self.sstables) <= 1:
             return None
 
-        all_entries: list[Entry] = []
-
-        for sstable in self.sstables:
-            all_entries.extend(sstable)
-
-        all_entries.sort(key=lambda x: x.sequence)
-
-        latest_entries: dict[str, Entry] = dict()
-        for entry in all_entries:
-            latest_entries[entry.key] = entry
-
-        # remove tombstones
-        compacted_entries = [
-            entry for entry in latest_entries.values() if entry.value != self.TOMBSTONE
-        ]
-
-        # sort by sequence
-        compacted_entries.sort(key=lambda x: x.sequence)
-
-        # replace sstables with the compacted copy
-        self.sstables = [compacted_entries] if compacted_entries else []
+        # stream the merged, tombstone-free entries straight into the new table
+        compacted_entries = (
+            entry
+            for entry in merge_entries(*self.sstables)
+            if entry.value != self.TOMBSTONE
+        )
+        compacted = self._write_sstable(
+            compacted_entries, sum(len(sstable) for sstable in self.sstables)
+        )
+
+        # replace sstables with the compacted copy, then drop the old files
+        old_sstables = self.sstables
+        self.sstables = [compacted]
+        if not len(compacted):
+            compacted.remove()
+            self.sstables = []
+        for sstable in old_sstables:
+            sstable.remove()
+        fsync_directory(self.directory)
 
     def scan(self, start_key: str, end_key: str) -> list[tuple[str, str]]:
         """scans a range of keys, returning sorted k-v pairs"""
-        results: list[Entry] = []
-
-        # collect data from sstables (oldest first, newest overrides)
-        for sstable in self.sstables:
-            for entry in sstable:
-                if start_key <= entry.key <= end_key:
-                    results.append(entry)
-
-        # overwrite with current memtable data
-        for entry in self._memtable.values():
-            if start_key <= entry.key <= end_key:
-                results.append(entry)
-
-        results.sort(key=lambda x: x.sequence)
-
-        latest_entries: dict[str, Entry] = dict()
-
-        for entry in results:
-            latest_entries[entry.key] = entry
-
-        sorted_results = [
-            (entry.key, entry.value)
-            for entry in sorted(latest_entries.values(), key=lambda e: e.key)
-            if entry.value != self.TOMBSTONE
-        ]
-
-        return sorted_results
+        return list(self.iter_scan(start_key, end_key))
+
+    def iter_scan(self, start_key: str, end_key: str) -> Iterator[tuple[str, str]]:
+        """
+        Lazily yield the live (key, value) pairs with start_key <= key <= end_key.
+
+        Merges the memtable and every SSTable with a heap, holding one pending
+        entry per source, so memory stays O(number of tables) however large the
+        range, and stopping early costs nothing. The memtable is snapshotted when
+        iteration starts; compacting during iteration is not supported.
+        """
+        memtable = sorted(
+            (
+                entry
+                for entry in self._memtable.values()
+                if start_key <= entry.key <= end_key
+            ),
+            key=lambda x: x.key,
+        )
+        sources = [sstable.scan(start_key, end_key) for sstable in self.sstables]
+        for entry in merge_entries(memtable, *sources):
+            if entry.value != self.TOMBSTONE:
+                yield entry.key, entry.value
 
     def _flush_memtable(self):
         if self._memtable:
             entries = list(self.memtable.values())
-            entries.sort(key=lambda x: x.sequence)
-            self.sstables.append(entries)
+            entries.sort(key=lambda x: x.key)
+            # the table and its directory entry are synced before the log is emptied
+            self.sstables.append(self._write_sstable(entries))
             self._memtable.clear()
+            self.wal.truncate()
+
+    def _write_sstable(
+        self, entries: Iterable[Entry], expected_entries: Optional[int] = None
+    ) -> SSTable:
+        name = f"{self._next_table:08d}{self.SSTABLE_SUFFIX}"
+        self._next_table += 1
+        return SSTable.write(
+            os.path.join(self.directory, name),
+            entries,
+            expected_entries=expected_entries,
+        )
+
+    def _table_number(self, sstable: SSTable) -> int:
+        return int(os.path.basename(sstable.path).removesuffix(self.SSTABLE_SUFFIX))
 
     @property
     def memtable(self):
         return self._memtable
+
+
+def merge_entries(*sources: Iterable[Entry]) -> Iterator[Entry]:
+    """
+    Merge key-sorted sources into one key-sorted stream, newest entry per key.
+
+    A lazy k-way heap merge: it holds one pending entry per source. Where several
+    sources hold a key, only the entry with the highest sequence is yielded.
+    Tombstones are passed through.
+    """
+    last_key = None
+    for entry in heapq.merge(*sources, key=lambda x: (x.key, -x.sequence)):
+        if entry.key != last_key:
+            last_key = entry.key
+            yield entry
@@ -0,0 +1,302 @@
+import array
+import bisect
+import mmap
+import os
+import struct
+import sys
+from typing import Iterable, Iterator, NamedTuple, Optional, Self
+
+from bloom_filter.bloom_filter import BloomFilter
+from hashing.hashers import DEFAULT_HASHER
+
+
+class Entry(NamedTuple):
+    key: str
+    value: str
+    sequence: int
+
+
+# File layout:
+#   data blocks: records of (key len, value len, sequence, key, value), packed
+#       until a block reaches BLOCK_SIZE bytes, then the offset of each record
+#       within the block and the record count, as uint32
+#   sparse index: one record per block of (offset, length, first key len, first key)
+#   last key: (key len, key), the upper fence
+#   filter: a BloomFilter of every key, in its `to_bytes` format
+#   footer: fixed-size, locates the index and the filter
+_RECORD = struct.Struct("<IIQ")  # key len, value len, sequence
+_INDEX_RECORD = struct.Struct("<QII")  # block offset, block length, first key len
+_KEY_LENGTH = struct.Struct("<I")
+_UINT32 = struct.Struct("<I")
+_FOOTER = struct.Struct("<QQQQQQ4sH")  # index, filter offsets and lengths, entries, ...
+_MAGIC = b"SSTB"
+_FORMAT_VERSION = 3
+
+
+def fsync_directory(directory: str | os.PathLike) -> None:
+    """Force the entries of a directory (created, renamed, removed files) to disk."""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SSTable:
+    """
+    Immutable, key-sorted table of entries stored in a file.
+
+    Only the sparse index, the first key of every block, is held in memory. A
+    lookup binary-searches the index for the one block that can hold the key, then
+    binary-searches that block's record offsets, reading O(log n) records in all
+    out of a read-only memory map. Memory use does not grow with the data.
+
+    Each table also stores its smallest and largest key (its fences) and a Bloom
+    filter of its keys. `might_contain` checks them without touching the data
+    blocks, so a lookup can skip most tables that do not hold the key.
+    """
+
+    BLOCK_SIZE = 4096
+    FILTER_FALSE_POS_RATE = 0.01
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < _FOOTER.size:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is too short to be an SSTable")
+        (
+            index_offset,
+            index_length,
+            filter_offset,
+            filter_length,
+            count,
+            max_sequence,
+            magic,
+            version,
+        ) = _FOOTER.unpack_from(self._mmap, len(self._mmap) - _FOOTER.size)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a supported SSTable")
+        self._count = count
+        self.max_sequence = max_sequence
+        self._filter = BloomFilter.from_bytes(
+            self._mmap[filter_offset : filter_offset + filter_length]
+        )
+
+        self._block_keys: list[str] = []
+        self._block_offsets: list[int] = []
+        self._block_lengths: list[int] = []
+        position = index_offset
+        while position < index_offset + index_length:
+            offset, length, key_length = _INDEX_RECORD.unpack_from(self._mmap, position)
+            position += _INDEX_RECORD.size
+            key = self._mmap[position : position + key_length].decode("utf-8")
+            position += key_length
+            self._block_keys.append(key)
+            self._block_offsets.append(offset)
+            self._block_lengths.append(length)
+
+        (key_length,) = _KEY_LENGTH.unpack_from(self._mmap, position)
+        position += _KEY_LENGTH.size
+        self.min_key = self._block_keys[0] if self._block_keys else None
+        self.max_key = self._mmap[position : position + key_length].decode("utf-8")
+
+    @classmethod
+    def write(
+        cls,
+        path: str | os.PathLike,
+        entries: Iterable[Entry],
+        block_size: int = BLOCK_SIZE,
+        expected_entries: Optional[int] = None,
+    ) -> Self:
+        """
+        Write entries, which must be sorted by key, to a new table file.
+
+        The file is written under a temporary name, synced and then renamed into
+        place, so a crash never leaves a partial table at `path`.
+
+        The Bloom filter is sized for `expected_entries`. When that is given,
+        entries are streamed straight to the file; otherwise they are collected
+        first to count them.
+        """
+        if expected_entries is None:
+            entries = list(entries)
+            expected_entries = len(entries)
+        key_filter = BloomFilter(
+            max(1, expected_entries), cls.FILTER_FALSE_POS_RATE, DEFAULT_HASHER
+        )
+
+        path = os.fspath(path)
+        temp_path = path + ".tmp"
+        index = bytearray()
+        count = 0
+        max_sequence = 0
+        with open(temp_path, "wb") as f:
+            offset = 0
+            block = bytearray()
+            record_offsets = []
+            first_key = b""
+            previous_key = None
+            for entry in entries:
+                if previous_key is not None and entry.key <= previous_key:
+                    raise ValueError("entries must be sorted by key without duplicates")
+                previous_key = entry.key
+                key_filter.add(entry.key)
+                key = entry.key.encode("utf-8")
+                value = entry.value.encode("utf-8")
+                if not block:
+                    first_key = key
+                record_offsets.append(len(block))
+                block += _RECORD.pack(len(key), len(value), entry.sequence)
+                block += key
+                block += value
+                count += 1
+                max_sequence = max(max_sequence, entry.sequence)
+                if len(block) >= block_size:
+                    data = cls._encode_block(block, record_offsets)
+                    index += _INDEX_RECORD.pack(offset, len(data), len(first_key))
+                    index += first_key
+                    f.write(data)
+                    offset += len(data)
+                    block = bytearray()
+                    record_offsets = []
+            if block:
+                data = cls._encode_block(block, record_offsets)
+                index += _INDEX_RECORD.pack(offset, len(data), len(first_key))
+                index += first_key
+                f.write(data)
+                offset += len(data)
+
+            last_key = b"" if previous_key is None else previous_key.encode("utf-8")
+            fence = _KEY_LENGTH.pack(len(last_key)) + last_key
+            filter_data = key_filter.to_bytes()
+
+            f.write(index)
+            f.write(fence)
+            f.write(filter_data)
+            f.write(
+                _FOOTER.pack(
+                    offset,
+                    len(index),
+                    offset + len(index) + len(fence),
+                    len(filter_data),
+                    count,
+                    max_sequence,
+                    _MAGIC,
+                    _FORMAT_VERSION,
+                )
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        # the rename is only durable once the directory entry itself is synced
+        fsync_directory(os.path.dirname(path) or ".")
+        return cls(path)
+
+    @staticmethod
+    def _encode_block(records: bytearray, record_offsets: list[int]) -> bytearray:
+        """Append the record offsets and count that let a block be binary-searched."""
+        records += struct.pack(f"<{len(record_offsets)}I", *record_offsets)
+        records += _UINT32.pack(len(record_offsets))
+        return records
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Entry]:
+        for block in range(len(self._block_keys)):
+            yield from self._read_block(block)
+
+    def might_contain(self, key: str) -> bool:
+        """
+        Whether the table may hold key, judged from its fences and Bloom filter.
+
+        False means the key is certainly absent.
+        """
+        if not self._count or key < self.min_key or key > self.max_key:
+            return False
+        return self._filter.contains(key)
+
+    def get(self, key: str) -> Optional[Entry]:
+        """Return the entry for key, reading O(log n) records."""
+        block = bisect.bisect_right(self._block_keys, key) - 1
+        if block < 0:
+            return None
+        offsets = self._record_offsets(block)
+        position = self._seek(block, offsets, key)
+        if position == len(offsets):
+            return None
+        entry, _ = self._read_record(self._block_offsets[block] + offsets[position])
+        return entry if entry.key == key else None
+
+    def scan(self, start_key: str, end_key: str) -> Iterator[Entry]:
+        """Yield entries with start_key <= key <= end_key, in key order."""
+        first = max(0, bisect.bisect_right(self._block_keys, start_key) - 1)
+        for block in range(first, len(self._block_keys)):
+            if self._block_keys[block] > end_key:
+                return None
+            start = 0
+            if block == first:
+                # seek straight to start_key rather than filtering the block
+                start = self._seek(block, self._record_offsets(block), start_key)
+            for entry in self._read_block(block, start):
+                if entry.key > end_key:
+                    return None
+                yield entry
+
+    def _record_offsets(self, block: int) -> array.array:
+        """The offsets of a block's records, relative to the start of the block."""
+        end = self._block_offsets[block] + self._block_lengths[block]
+        (count,) = _UINT32.unpack_from(self._mmap, end - _UINT32.size)
+        start = end - _UINT32.size * (count + 1)
+        offsets = array.array("I", self._mmap[start : end - _UINT32.size])
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        return offsets
+
+    def _seek(self, block: int, offsets: array.array, key: str) -> int:
+        """Binary-search a block for the first record with a key >= key."""
+        base = self._block_offsets[block]
+        return bisect.bisect_left(
+            offsets, key, key=lambda offset: self._read_key(base + offset)
+        )
+
+    def _read_key(self, position: int) -> str:
+        key_length = _UINT32.unpack_from(self._mmap, position)[0]
+        start = position + _RECORD.size
+        return self._mmap[start : start + key_length].decode("utf-8")
+
+    def _read_record(self, position: int) -> tuple[Entry, int]:
+        """Decode the record at position, returning it and the position after it."""
+        data = self._mmap
+        key_length, value_length, sequence = _RECORD.unpack_from(data, position)
+        position += _RECORD.size
+        key = data[position : position + key_length].decode("utf-8")
+        position += key_length
+        value = data[position : position + value_length].decode("utf-8")
+        position += value_length
+        return Entry(key, value, sequence), position
+
+    def _read_block(self, block: int, start: int = 0) -> Iterator[Entry]:
+        """Yield a block's entries, from its start-th record on."""
+        offsets = self._record_offsets(block)
+        if start >= len(offsets):
+            return None
+        base = self._block_offsets[block]
+        position = base + offsets[start]
+        end = base + self._block_lengths[block] - _UINT32.size * (len(offsets) + 1)
+        while position < end:
+            entry, position = self._read_record(position)
+            yield entry
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._mmap.close()
+
+    def remove(self) -> None:
+        """Close the table and delete its file."""
+        self.close()
+        os.remove(self.path)
@@ -1,4 +1,6 @@
-from .lsm_tree import LSMTree
+from . import lsm_tree, sstable
+from .lsm_tree import LSMTree, merge_entries
+from .sstable import Entry
 
 
 def test_put_and_get_single_item():
@@ -142,3 +144,146 @@ def test_end_to_end_workflow():
 
     scan_results = lsm.scan("user_1", "user_6")
     assert len(scan_results) == 5
+
+
+def test_flushed_data_survives_reopen(tmp_path):
+    with LSMTree(memtable_size_limit=2, directory=tmp_path) as lsm:
+        lsm.put("a", "1")
+        lsm.put("b", "2")  # flush
+        lsm.put("a", "updated")
+        lsm.delete("b")  # flush
+        lsm.put("c", "3")  # flushed by close
+
+    assert sorted(p.name for p in tmp_path.glob("*.sst")) == [
+        "00000001.sst",
+        "00000002.sst",
+        "00000003.sst",
+    ]
+    with LSMTree(memtable_size_limit=2, directory=tmp_path) as lsm:
+        assert lsm.get("a") == "updated"
+        assert lsm.get("b") is None
+        assert lsm.scan("a", "z") == [("a", "updated"), ("c", "3")]
+
+        # new writes continue the sequence, so they still win over old tables
+        lsm.put("c", "4")
+        assert lsm.next_seq == 7
+        assert lsm.get("c") == "4"
+
+
+def test_compaction_replaces_table_files(tmp_path):
+    with LSMTree(memtable_size_limit=1, directory=tmp_path) as lsm:
+        for i in range(5):
+            lsm.put(f"k{i}", str(i))
+        lsm.compact()
+        assert [p.name for p in tmp_path.glob("*.sst")] == ["00000006.sst"]
+        assert [e.key for e in lsm.sstables[0]] == [f"k{i}" for i in range(5)]
+
+
+def test_unflushed_writes_are_recovered_from_the_log(tmp_path):
+    lsm = LSMTree(memtable_size_limit=3, directory=tmp_path)
+    lsm.put("a", "1")
+    lsm.put("b", "2")
+    lsm.put("c", "3")  # flush, which empties the log
+    lsm.put("a", "updated")
+    lsm.delete("b")
+    # simulate a crash: nothing is flushed or closed
+    lsm.wal._file.close()
+
+    recovered = LSMTree(memtable_size_limit=3, directory=tmp_path)
+    assert recovered.memtable.keys() == {"a", "b"}
+    assert recovered.get("a") == "updated"
+    assert recovered.get("b") is None
+    assert recovered.get("c") == "3"
+    assert recovered.next_seq == 6
+    recovered.close()
+
+
+def test_get_skips_tables_that_cannot_hold_the_key():
+    lsm = LSMTree(memtable_size_limit=100)
+    for table in range(5):
+        for i in range(100):
+            lsm.put(f"t{table}:{i:03d}", "v")  # each table holds its own key range
+    assert len(lsm.sstables) == 5
+
+    assert lsm.get("t0:000") == "v"
+    assert (lsm.sstables_probed, lsm.sstables_skipped) == (1, 4)
+
+    assert lsm.get("t2:missing") is None
+    assert lsm.sstables_skipped >= 8
+    lsm.close()
+
+
+def test_merge_entries_keeps_the_newest_entry_per_key():
+    older = [Entry("a", "1", 1), Entry("b", "2", 2), Entry("d", "4", 3)]
+    newer = [Entry("b", LSMTree.TOMBSTONE, 5), Entry("c", "3", 4)]
+    newest = [Entry("a", "updated", 6)]
+
+    assert list(merge_entries(older, newer, newest)) == [
+        Entry("a", "updated", 6),
+        Entry("b", LSMTree.TOMBSTONE, 5),
+        Entry("c", "3", 4),
+        Entry("d", "4", 3),
+    ]
+
+
+def test_iter_scan_is_lazy_and_matches_scan():
+    lsm = LSMTree(memtable_size_limit=10)
+    for i in range(95):
+        lsm.put(f"k{i:03d}", str(i))
+    for i in range(0, 95, 3):
+        lsm.delete(f"k{i:03d}")
+    lsm.put("k001", "updated")
+
+    results = lsm.iter_scan("k000", "k050")
+    assert next(results) == ("k001", "updated")
+    assert next(results) == ("k002", "2")
+    assert list(lsm.iter_scan("k000", "k099")) == lsm.scan("k000", "k099")
+    assert len(lsm.scan("k000", "k099")) == 95 - 32
+    lsm.close()
+
+
+def test_compacting_only_tombstones_leaves_no_tables(tmp_path):
+    with LSMTree(memtable_size_limit=2, directory=tmp_path) as lsm:
+        lsm.put("a", "1")
+        lsm.put("b", "2")  # flush
+        lsm.delete("a")
+        lsm.delete("b")  # flush
+        lsm.compact()
+        assert lsm.sstables == []
+        assert list(tmp_path.glob("*.sst")) == []
+        assert lsm.get("a") is None
+
+
+def test_flush_syncs_the_directory_before_emptying_the_log(tmp_path, monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        sstable, "fsync_directory", lambda directory: events.append("directory")
+    )
+    monkeypatch.setattr(
+        lsm_tree, "fsync_directory", lambda directory: events.append("directory")
+    )
+    with LSMTree(memtable_size_limit=2, directory=tmp_path) as lsm:
+        truncate = lsm.wal.truncate
+        monkeypatch.setattr(
+            lsm.wal, "truncate", lambda: (events.append("truncate"), truncate())
+        )
+        lsm.put("a", "1")
+        lsm.put("b", "2")  # flush
+        assert events == ["directory", "truncate"]
+        lsm.put("c", "3")
+        lsm.put("d", "4")  # flush
+        events.clear()
+        lsm.compact()
+        assert events == ["directory", "directory"]  # new table, removed tables
+
+
+def test_log_sync_settings_are_passed_to_the_log(tmp_path):
+    with LSMTree(directory=tmp_path) as lsm:
+        assert lsm.wal.sync_policy == "always"
+    with LSMTree() as lsm:
+        assert lsm.wal.sync_policy == "none"
+    with LSMTree(
+        directory=tmp_path, sync="group", group_records=7, group_interval=0.5
+    ) as lsm:
+        assert lsm.wal.sync_policy == "group"
+        assert (lsm.wal.group_records, lsm.wal.group_interval) == (7, 0.5)
@@ -0,0 +1,91 @@
+import pytest
+
+from .sstable import Entry, SSTable
+
+
+def _entries(n):
+    return [Entry(f"key:{i:05d}", f"value:{i}", i + 1) for i in range(n)]
+
+
+def test_round_trips_entries_across_many_blocks(tmp_path):
+    entries = _entries(2_000)
+    table = SSTable.write(tmp_path / "1.sst", entries, block_size=256)
+
+    assert len(table._block_keys) > 100
+    assert len(table) == 2_000
+    assert table.max_sequence == 2_000
+    assert list(table) == entries
+    table.close()
+
+
+def test_get_reads_only_the_matching_block(tmp_path):
+    entries = _entries(2_000)
+    table = SSTable.write(tmp_path / "1.sst", entries, block_size=256)
+
+    for entry in entries[::37]:
+        assert table.get(entry.key) == entry
+    assert table.get("key:00010x") is None
+    assert table.get("a") is None
+    assert table.get("z") is None
+    table.close()
+
+
+def test_scan_returns_inclusive_range(tmp_path):
+    table = SSTable.write(tmp_path / "1.sst", _entries(2_000), block_size=256)
+
+    keys = [entry.key for entry in table.scan("key:00100", "key:00199")]
+    assert keys == [f"key:{i:05d}" for i in range(100, 200)]
+    assert list(table.scan("key:99999", "z")) == []
+    assert [e.key for e in table.scan("a", "key:00001")] == ["key:00000", "key:00001"]
+    table.close()
+
+
+def test_reopens_from_file(tmp_path):
+    entries = [Entry("é", "ü", 3), Entry("ñ", "", 7)]
+    SSTable.write(tmp_path / "1.sst", entries).close()
+
+    table = SSTable(tmp_path / "1.sst")
+    assert list(table) == entries
+    assert table.max_sequence == 7
+    table.remove()
+    assert not (tmp_path / "1.sst").exists()
+
+
+def test_rejects_unsorted_entries_and_invalid_files(tmp_path):
+    with pytest.raises(ValueError, match="sorted"):
+        SSTable.write(tmp_path / "1.sst", [Entry("b", "", 1), Entry("a", "", 2)])
+
+    (tmp_path / "bad.sst").write_bytes(b"x" * 64)
+    with pytest.raises(ValueError, match="not a supported SSTable"):
+        SSTable(tmp_path / "bad.sst")
+
+
+def test_fences_and_filter_rule_out_absent_keys(tmp_path):
+    entries = _entries(2_000)
+    table = SSTable.write(tmp_path / "1.sst", entries, block_size=256)
+
+    assert (table.min_key, table.max_key) == ("key:00000", "key:01999")
+    assert all(table.might_contain(entry.key) for entry in entries)
+    assert not table.might_contain("a")
+    assert not table.might_contain("z")
+    false_positives = sum(table.might_contain(f"key:{i:05d}x") for i in range(2_000))
+    assert false_positives < 100
+    table.close()
+
+
+def test_blocks_are_binary_searched(tmp_path):
+    entries = _entries(500)
+    table = SSTable.write(tmp_path / "1.sst", entries, block_size=1 << 20)
+    assert len(table._block_keys) == 1
+
+    reads = []
+    read_key = table._read_key
+    table._read_key = lambda position: reads.append(position) or read_key(position)
+    assert table.get("key:00321") == entries[321]
+    assert len(reads) <= 10  # log2(500) + 1
+
+    reads.clear()
+    scanned = list(table.scan("key:00490", "key:00492"))
+    assert scanned == entries[490:493]
+    assert len(reads) <= 10
+    table.close()
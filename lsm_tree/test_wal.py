@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from .sstable import Entry
+from .wal import WriteAheadLog
+
+
+def _entries(n):
+    return [Entry(f"key:{i}", f"value:{i}", i + 1) for i in range(n)]
+
+
+@pytest.mark.parametrize("sync", WriteAheadLog.SYNC_POLICIES)
+def test_replays_appended_entries(tmp_path, sync):
+    wal = WriteAheadLog(tmp_path / "wal.log", sync=sync, group_records=3)
+    for entry in _entries(10):
+        wal.append(entry)
+    wal.close()
+
+    assert list(WriteAheadLog.replay(tmp_path / "wal.log")) == _entries(10)
+
+
+def test_open_drops_torn_tail(tmp_path):
+    path = tmp_path / "wal.log"
+    wal = WriteAheadLog(path)
+    for entry in _entries(3):
+        wal.append(entry)
+    wal.close()
+    intact = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03\x04\x05")  # a record cut short by a crash
+
+    wal, entries = WriteAheadLog.open(path)
+    assert entries == _entries(3)
+    assert path.stat().st_size == intact
+    wal.append(Entry("after", "crash", 4))
+    wal.close()
+    assert list(WriteAheadLog.replay(path))[-1] == Entry("after", "crash", 4)
+
+
+def test_replay_stops_at_corrupt_record(tmp_path):
+    path = tmp_path / "wal.log"
+    wal = WriteAheadLog(path)
+    for entry in _entries(3):
+        wal.append(entry)
+    wal.close()
+
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF  # flip a bit in the last record's value
+    path.write_bytes(bytes(data))
+    assert list(WriteAheadLog.replay(path)) == _entries(2)
+
+
+def test_truncate_empties_the_log(tmp_path):
+    wal = WriteAheadLog(tmp_path / "wal.log")
+    wal.append(Entry("a", "1", 1))
+    wal.truncate()
+    wal.append(Entry("b", "2", 2))
+    wal.close()
+    assert list(WriteAheadLog.replay(tmp_path / "wal.log")) == [Entry("b", "2", 2)]
+
+
+def test_rejects_unknown_sync_policy(tmp_path):
+    with pytest.raises(ValueError, match="sync must be one of"):
+        WriteAheadLog(tmp_path / "wal.log", sync="sometimes")
+
+
+def test_group_is_synced_after_the_interval_without_further_writes(tmp_path):
+    wal = WriteAheadLog(
+        tmp_path / "wal.log", sync="group", group_records=100, group_interval=0.2
+    )
+    wal.append(Entry("a", "1", 1))
+    assert wal._unsynced == 1
+
+    deadline = time.monotonic() + 5
+    while wal._unsynced and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert wal._unsynced == 0
+    wal.close()
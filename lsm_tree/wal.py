@@ -0,0 +1,151 @@
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Iterator, Self
+
+from .sstable import Entry
+
+# Each record is a header of (crc32 of the payload, payload length) followed by the
+# payload: (key len, value len, sequence, key, value).
+_HEADER = struct.Struct("<II")
+_PAYLOAD = struct.Struct("<IIQ")
+
+
+class WriteAheadLog:
+    """
+    Append-only log of the writes not yet flushed to an SSTable.
+
+    Every record carries a CRC32 of its payload. A crash can leave a torn record at
+    the end of the log; `replay` stops at the first record that is short or fails
+    its check, and `open` cuts it off so new records follow the last good one.
+
+    Records are handed to the OS as they are appended, so they survive a crash of
+    the process. `sync` decides how often they are also fsynced to survive a crash
+    of the machine:
+    - "always": after every record. Nothing acknowledged is ever lost.
+    - "group": once `group_records` records have accumulated since the last sync,
+      or `group_interval` seconds after the first of them was appended, by a
+      background timer if no further write arrives (group commit). At most one
+      group is lost.
+    - "none": only on `truncate` and `close`; otherwise the OS writes the log back
+      when it chooses.
+    """
+
+    SYNC_POLICIES = ("always", "group", "none")
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        sync: str = "always",
+        group_records: int = 100,
+        group_interval: float = 0.01,
+    ):
+        if sync not in self.SYNC_POLICIES:
+            raise ValueError(f"sync must be one of {self.SYNC_POLICIES}")
+        self.path = os.fspath(path)
+        self.sync_policy = sync
+        self.group_records = group_records
+        self.group_interval = group_interval
+
+        self._file = open(self.path, "ab", buffering=0)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        # guards the file and counters against the group commit timer's thread
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+
+    @classmethod
+    def open(cls, path: str | os.PathLike, **kwargs) -> tuple[Self, list[Entry]]:
+        """Replay an existing log, drop any torn tail and open it for appending."""
+        entries = []
+        good_length = 0
+        if os.path.exists(path):
+            for entry, end in cls._read(path):
+                entries.append(entry)
+                good_length = end
+            if os.path.getsize(path) != good_length:
+                os.truncate(path, good_length)
+        return cls(path, **kwargs), entries
+
+    @classmethod
+    def replay(cls, path: str | os.PathLike) -> Iterator[Entry]:
+        """Yield the entries of a log in the order they were written."""
+        for entry, _ in cls._read(path):
+            yield entry
+
+    @staticmethod
+    def _read(path: str | os.PathLike) -> Iterator[tuple[Entry, int]]:
+        """Yield each valid entry with the offset just after it."""
+        with open(path, "rb") as f:
+            data = f.read()
+        position = 0
+        while position + _HEADER.size <= len(data):
+            crc, length = _HEADER.unpack_from(data, position)
+            start = position + _HEADER.size
+            payload = data[start : start + length]
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                return None
+            key_length, value_length, sequence = _PAYLOAD.unpack_from(payload)
+            key_end = _PAYLOAD.size + key_length
+            key = payload[_PAYLOAD.size : key_end].decode("utf-8")
+            value = payload[key_end : key_end + value_length].decode("utf-8")
+            position = start + length
+            yield Entry(key, value, sequence), position
+
+    def append(self, entry: Entry) -> None:
+        key = entry.key.encode("utf-8")
+        value = entry.value.encode("utf-8")
+        payload = _PAYLOAD.pack(len(key), len(value), entry.sequence) + key + value
+        record = _HEADER.pack(zlib.crc32(payload), len(payload)) + payload
+
+        with self._lock:
+            self._file.write(record)
+            self._unsynced += 1
+            if self.sync_policy == "always":
+                self._sync()
+            elif self.sync_policy == "group":
+                if (
+                    self._unsynced >= self.group_records
+                    or time.monotonic() - self._last_sync >= self.group_interval
+                ):
+                    self._sync()
+                elif self._timer is None:
+                    self._timer = threading.Timer(
+                        self.group_interval, self._sync_on_timer
+                    )
+                    self._timer.daemon = True
+                    self._timer.start()
+
+    def sync(self) -> None:
+        """Force every appended record to stable storage."""
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _sync_on_timer(self) -> None:
+        """Sync a group that no later append completed within `group_interval`."""
+        with self._lock:
+            self._timer = None
+            if self._unsynced and not self._file.closed:
+                self._sync()
+
+    def truncate(self) -> None:
+        """Empty the log, once its records are safely stored elsewhere."""
+        with self._lock:
+            self._file.truncate(0)
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._unsynced:
+                self._sync()
+            self._file.close()
@@ -0,0 +1,2 @@
+from .skip_list import SkipList
+from .concurrent_skip_list import ConcurrentSkipList
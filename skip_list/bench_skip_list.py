@@ -0,0 +1,98 @@
+"""
+Memory use and throughput of SkipList with __slots__ nodes against the original
+dict-backed nodes, and of its bulk-loading paths.
+
+Run with:
+    python -m skip_list.bench_skip_list [--items N]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from unittest import mock
+
+from . import skip_list
+from .skip_list import SkipList
+
+
+class _LegacyNode:
+    """SkipListNode without __slots__, so every instance carries a __dict__."""
+
+    def __init__(self, key, level, value=None):
+        self._key = key
+        self._value = value
+        self._forward = [None] * (level + 1)
+        self._width = [1] * (level + 1)
+
+
+def _rate(n: int, start: float) -> float:
+    return n / (time.perf_counter() - start)
+
+
+def _measure(label: str, keys: list[int]) -> None:
+    random.seed(0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    sl = SkipList(max_level=24)
+    for key in keys:
+        sl.insert(key)
+    insert_rate = _rate(len(keys), start)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for key in keys:
+        sl.contains(key)
+    contains_rate = _rate(len(keys), start)
+
+    print(
+        f"{label:<10} {memory / len(keys):>12.1f}"
+        f" {insert_rate:>14,.0f} {contains_rate:>14,.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    keys = rng.sample(range(args.items * 10), args.items)
+
+    print(f"items={args.items:,}")
+    print(f"{'nodes':<10} {'bytes/key':>12} {'inserts/s':>14} {'lookups/s':>14}")
+    with mock.patch.object(skip_list, "SkipListNode", _LegacyNode):
+        _measure("dict", keys)
+    _measure("slots", keys)
+    bulk(keys)
+
+
+def bulk(keys: list[int]) -> None:
+    """Loading sorted keys, and adding a random batch to a loaded list."""
+    ordered = sorted(keys)
+    batch = keys[: len(keys) // 4]
+
+    print(f"\n{'load':<28} {'keys/s':>14}")
+    start = time.perf_counter()
+    sl = SkipList(max_level=24)
+    for key in ordered:
+        sl.insert(key)
+    print(f"{'insert, sorted keys':<28} {_rate(len(keys), start):>14,.0f}")
+    start = time.perf_counter()
+    SkipList.from_sorted(ordered, max_level=24)
+    print(f"{'from_sorted':<28} {_rate(len(keys), start):>14,.0f}")
+
+    sl = SkipList.from_sorted(ordered[1::2], max_level=24)
+    start = time.perf_counter()
+    for key in batch:
+        sl.insert(key)
+    print(f"{'insert, random batch':<28} {_rate(len(batch), start):>14,.0f}")
+    sl = SkipList.from_sorted(ordered[1::2], max_level=24)
+    start = time.perf_counter()
+    sl.insert_many(batch)
+    print(f"{'insert_many, random batch':<28} {_rate(len(batch), start):>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import random
+import threading
+import time
+from typing import Iterator
+
+
+class ConcurrentSkipListNode:
+    __slots__ = ("_key", "_value", "_forward", "_lock", "_marked", "_fully_linked")
+
+    def __init__(self, key, level, value=None):
+        self._key = key
+        self._value = value
+        self._forward = [None] * (level + 1)
+        self._lock = threading.Lock()
+        self._marked = False  # logically deleted, about to be unlinked
+        self._fully_linked = False  # linked at every one of its levels
+
+    @property
+    def _top_level(self):
+        return len(self._forward) - 1
+
+
+class ConcurrentSkipList:
+    """
+    Thread-safe skip list for many concurrent readers and writers.
+
+    This is the lazy skip list of Herlihy, Lev, Luchangco and Shavit ("A Simple
+    Optimistic Skiplist Algorithm"):
+    - Reads (`contains`, `get`, `range`) take no locks. A key is present once its
+      node is fully linked and until it is marked.
+    - `insert` searches without locks, then locks only the predecessor at each of
+      the new node's levels, checks that nothing changed, and links bottom-up.
+    - `delete` marks the node (logical deletion) under its own lock, then locks
+      its predecessors and unlinks it top-down.
+    Locks are always taken bottom-up, so writers cannot deadlock, and a failed
+    validation just retries the search.
+
+    Under free-threaded CPython readers run in parallel with each other and with
+    writers that touch other parts of the list. Under the GIL it stays correct but
+    only one thread runs at a time.
+    """
+
+    def __init__(self, max_level=16, probability=0.5):
+        self.max_level = max_level
+        self.probability = probability
+        self.head = ConcurrentSkipListNode(None, max_level)
+        self.head._fully_linked = True
+        self._size = 0
+        self._size_lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def _find(self, key, preds, succs) -> int:
+        """
+        Fill preds and succs with the nodes around key at every level.
+
+        Returns the highest level at which a node with key was found, or -1.
+        """
+        found = -1
+        pred = self.head
+        for level in range(self.max_level, -1, -1):
+            curr = pred._forward[level]
+            while curr is not None and curr._key < key:
+                pred = curr
+                curr = pred._forward[level]
+            if found == -1 and curr is not None and curr._key == key:
+                found = level
+            preds[level] = pred
+            succs[level] = curr
+        return found
+
+    def _find_node(self, key):
+        """Return the node with key if it is present, without taking any locks."""
+        pred = self.head
+        for level in range(self.max_level, -1, -1):
+            curr = pred._forward[level]
+            while curr is not None and curr._key < key:
+                pred = curr
+                curr = pred._forward[level]
+            if curr is not None and curr._key == key:
+                if curr._fully_linked and not curr._marked:
+                    return curr
+                return None
+        return None
+
+    def insert(self, key, value=None):
+        """Insert a key, or replace the value of an existing key."""
+        top_level = self.generate_random_level()
+        preds = [None] * (self.max_level + 1)
+        succs = [None] * (self.max_level + 1)
+
+        while True:
+            found = self._find(key, preds, succs)
+            if found != -1:
+                node = succs[found]
+                if not node._marked:
+                    # another thread is still linking it; it will be there shortly
+                    while not node._fully_linked:
+                        time.sleep(0)
+                    node._value = value
+                    return
+                # it is being deleted, so search again once it is unlinked
+                continue
+
+            locked = []
+            try:
+                valid = True
+                for level in range(top_level + 1):
+                    pred = preds[level]
+                    succ = succs[level]
+                    if not locked or locked[-1] is not pred:
+                        pred._lock.acquire()
+                        locked.append(pred)
+                    valid = (
+                        not pred._marked
+                        and (succ is None or not succ._marked)
+                        and pred._forward[level] is succ
+                    )
+                    if not valid:
+                        break
+                if not valid:
+                    continue
+
+                node = ConcurrentSkipListNode(key, top_level, value)
+                for level in range(top_level + 1):
+                    node._forward[level] = succs[level]
+                for level in range(top_level + 1):
+                    preds[level]._forward[level] = node
+                node._fully_linked = True
+                with self._size_lock:
+                    self._size += 1
+                return
+            finally:
+                for pred in locked:
+                    pred._lock.release()
+
+    def contains(self, key):
+        """Check if a key exists in the skip list. Takes no locks."""
+        return self._find_node(key) is not None
+
+    def get(self, key, default=None):
+        """Return the value stored under key, or default. Takes no locks."""
+        node = self._find_node(key)
+        return default if node is None else node._value
+
+    def delete(self, key):
+        """Delete a key from the skip list. Returns whether this call removed it."""
+        preds = [None] * (self.max_level + 1)
+        succs = [None] * (self.max_level + 1)
+        victim = None
+        is_marked = False
+
+        while True:
+            found = self._find(key, preds, succs)
+            if not is_marked:
+                if found == -1:
+                    return False
+                victim = succs[found]
+                if not (
+                    victim._fully_linked
+                    and victim._top_level == found
+                    and not victim._marked
+                ):
+                    return False
+                victim._lock.acquire()
+                if victim._marked:
+                    victim._lock.release()
+                    return False
+                victim._marked = True
+                is_marked = True
+
+            locked = []
+            try:
+                valid = True
+                for level in range(victim._top_level + 1):
+                    pred = preds[level]
+                    if not locked or locked[-1] is not pred:
+                        pred._lock.acquire()
+                        locked.append(pred)
+                    valid = not pred._marked and pred._forward[level] is victim
+                    if not valid:
+                        break
+                if not valid:
+                    continue
+
+                for level in range(victim._top_level, -1, -1):
+                    preds[level]._forward[level] = victim._forward[level]
+                victim._lock.release()
+                with self._size_lock:
+                    self._size -= 1
+                return True
+            finally:
+                for pred in locked:
+                    pred._lock.release()
+
+    def range(self, lo=None, hi=None) -> Iterator[tuple]:
+        """
+        Lazily yield (key, value) pairs with lo <= key < hi, in key order.
+
+        Takes no locks. The iteration is weakly consistent: it reflects some of the
+        changes made while it runs, and never yields a key twice.
+        """
+        pred = self.head
+        if lo is not None:
+            for level in range(self.max_level, -1, -1):
+                curr = pred._forward[level]
+                while curr is not None and curr._key < lo:
+                    pred = curr
+                    curr = pred._forward[level]
+        curr = pred._forward[0]
+        while curr is not None and (hi is None or curr._key < hi):
+            if curr._fully_linked and not curr._marked:
+                yield curr._key, curr._value
+            curr = curr._forward[0]
+
+    def generate_random_level(self):
+        """Generate a random level for a node using geometric distribution."""
+        level = 0
+        while random.random() < self.probability and level < self.max_level:
+            level += 1
+        return level
+
+    def to_list(self):
+        """Return all keys in sorted order."""
+        return [key for key, _ in self.range()]
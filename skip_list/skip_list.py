@@ -1,14 +1,33 @@
+import itertools
+import operator
 import random
-from typing import Optional
+from typing import Iterator, Optional
 
 
 class SkipListNode:
-    def __init__(self, key, level):
+    # No per-node __dict__: a node is just its key, value and pointer lists.
+    # At millions of keys this saves tens of bytes per node.
+    __slots__ = ("_key", "_value", "_forward", "_width")
+
+    def __init__(self, key, level, value=None):
         self._key = key
+        self._value = value
         self._forward = [None] * (level + 1)
+        # _width[i] is the number of level-0 steps from this node to _forward[i]
+        # (a link to None counts as reaching the position after the last node;
+        # the head's widths are only kept up to the list's current level)
+        self._width = [1] * (level + 1)
 
 
 class SkipList:
+    """
+    Skip list storing keys in sorted order, each with an optional value.
+
+    Every link records its width, the number of nodes it skips over plus one
+    (Pugh, "A Skip List Cookbook"). Summing widths along a search path gives a
+    node's position, so `rank` and `select` are O(log n) like the other lookups.
+    """
+
     def __init__(self, max_level=16, probability=0.5):
         """
         Initialize skip list with configurable parameters.
@@ -18,84 +37,290 @@ class SkipList:
         self.max_level = max_level
         self.probability = probability
         self.level = 0  # Current highest level in use
+        self._size = 0
 
         # Create head node (sentinel) with maximum possible levels
         self.head = SkipListNode(None, max_level)
 
-    def insert(self, key):
-        """Insert a key into the skip list."""
-        # Array to track update positions at each level
-        update = [None] * (self.max_level + 1)
+    def __len__(self):
+        return self._size
+
+    def _search_path(self, key):
+        """
+        Find the last node before key at every level.
+
+        Returns the list of those nodes, indexed by level, and the position of
+        each one (the head is position 0, the first node position 1).
+        """
+        update = [self.head] * (self.max_level + 1)
+        rank = [0] * (self.max_level + 1)
         current = self.head
+        position = 0
 
         # Search down from top level to find insertion point
         for i in range(self.level, -1, -1):
-            while current._forward[i] is not None and current._forward[i]._key < key:
-                current = current._forward[i]
+            following = current._forward[i]
+            while following is not None and following._key < key:
+                position += current._width[i]
+                current = following
+                following = current._forward[i]
             update[i] = current
+            rank[i] = position
+        return update, rank
+
+    def _predecessor(self, key) -> SkipListNode:
+        """Return the last node with a key less than key, or the head."""
+        current = self.head
+        for i in range(self.level, -1, -1):
+            following = current._forward[i]
+            while following is not None and following._key < key:
+                current = following
+                following = current._forward[i]
+        return current
+
+    @classmethod
+    def from_sorted(
+        cls, keys, values=None, max_level=16, probability=0.5, deterministic=False
+    ):
+        """
+        Build a skip list from keys in ascending order in one O(n) pass.
+
+        Each node is appended after the last node of each of its levels, so no
+        searching is needed. With deterministic=True node n (1-based) is promoted
+        once for every power of round(1 / probability) dividing n, giving perfectly
+        balanced levels; otherwise levels are drawn at random as in `insert`.
+        A repeated key keeps the last value given for it.
+        """
+        sl = cls(max_level, probability)
+        if values is None:
+            pairs = zip(keys, itertools.repeat(None))
+        else:
+            pairs = zip(keys, values, strict=True)
+        step = max(2, round(1 / probability)) if probability > 0 else 0
+
+        tails = [sl.head] * (max_level + 1)
+        tail_positions = [0] * (max_level + 1)
+        position = 0
+        for key, value in pairs:
+            last = tails[0]
+            if position:
+                if key == last._key:
+                    last._value = value
+                    continue
+                if key < last._key:
+                    raise ValueError("keys must be in ascending order")
+            position += 1
+
+            if deterministic:
+                level = 0
+                remainder = position
+                while step and level < max_level and remainder % step == 0:
+                    remainder //= step
+                    level += 1
+            else:
+                level = sl.generate_random_level()
+
+            node = SkipListNode(key, level, value)
+            for i in range(level + 1):
+                tails[i]._forward[i] = node
+                tails[i]._width[i] = position - tail_positions[i]
+                tails[i] = node
+                tail_positions[i] = position
+            if level > sl.level:
+                sl.level = level
+
+        # the last node of each level links to None, one step past the end
+        for i in range(sl.level + 1):
+            tails[i]._width[i] = position + 1 - tail_positions[i]
+        sl._size = position
+        return sl
+
+    def insert(self, key, value=None):
+        """Insert a key into the skip list, or replace the value of an existing key."""
+        update, rank = self._search_path(key)
 
         # Move to next node (potential duplicate)
-        current = current._forward[0]
+        current = update[0]._forward[0]
+        if current is not None and current._key == key:
+            current._value = value
+            return
 
-        # If key doesn't exist, create new node
-        if current is None or current._key != key:
-            # Generate random level for new node
-            new_level = self.generate_random_level()
+        self._link(key, value, update, rank)
 
-            # If new level exceeds current level, update pointers
-            if new_level > self.level:
-                for i in range(self.level + 1, new_level + 1):
-                    update[i] = self.head
-                self.level = new_level
+    def insert_many(self, keys, values=None):
+        """
+        Insert many keys, or replace their values, in one pass.
 
-            # Create and link new node
-            new_node = SkipListNode(key, new_level)
-            for i in range(new_level + 1):
-                new_node._forward[i] = update[i]._forward[i]
-                update[i]._forward[i] = new_node
+        The batch is sorted first, and each search starts from the previous key's
+        search path (its finger) rather than the head. It climbs only as high as it
+        must to pass the keys in between, so a dense batch costs little more than
+        walking level 0.
+        """
+        if values is None:
+            pairs = [(key, None) for key in keys]
+        else:
+            pairs = list(zip(keys, values, strict=True))
+        # stable, so for a repeated key the last value wins as with `insert`
+        pairs.sort(key=operator.itemgetter(0))
 
-    def contains(self, key):
-        """Check if a key exists in the skip list."""
-        current = self.head
+        update = [self.head] * (self.max_level + 1)
+        rank = [0] * (self.max_level + 1)
+        last = None
+        for key, value in pairs:
+            if last is not None and last._key == key:
+                last._value = value
+                continue
 
-        # Search down from top level
-        for i in range(self.level, -1, -1):
-            while current._forward[i] is not None and current._forward[i]._key < key:
-                current = current._forward[i]
+            # climb while the finger at the next level up still lies before key
+            top = -1
+            while top < self.level:
+                following = update[top + 1]._forward[top + 1]
+                if following is None or not following._key < key:
+                    break
+                top += 1
+
+            current = self.head
+            position = 0
+            for i in range(top, -1, -1):
+                if rank[i] > position:
+                    current = update[i]
+                    position = rank[i]
+                following = current._forward[i]
+                while following is not None and following._key < key:
+                    position += current._width[i]
+                    current = following
+                    following = current._forward[i]
+                update[i] = current
+                rank[i] = position
 
-        # Check if we found the key
-        current = current._forward[0]
+            last = update[0]._forward[0]
+            if last is not None and last._key == key:
+                last._value = value
+                continue
+
+            last = self._link(key, value, update, rank)
+            # the new node precedes every later key, so it becomes the finger
+            position = rank[0] + 1
+            for i in range(len(last._forward)):
+                update[i] = last
+                rank[i] = position
+
+    def _link(self, key, value, update, rank) -> SkipListNode:
+        """Link a new node after the search path `update`, whose positions are `rank`."""
+        # Generate random level for new node
+        new_level = self.generate_random_level()
+        if new_level > self.level:
+            # the head's links on levels coming into use span the whole list
+            for i in range(self.level + 1, new_level + 1):
+                self.head._width[i] = self._size + 1
+            self.level = new_level
+
+        # Create and link new node, splitting the width of each link it cuts
+        new_node = SkipListNode(key, new_level, value)
+        position = rank[0] + 1
+        for i in range(new_level + 1):
+            previous = update[i]
+            new_node._forward[i] = previous._forward[i]
+            previous._forward[i] = new_node
+            new_node._width[i] = previous._width[i] - (position - rank[i]) + 1
+            previous._width[i] = position - rank[i]
+
+        # Links passing over the new node now skip one more node
+        for i in range(new_level + 1, self.level + 1):
+            update[i]._width[i] += 1
+        self._size += 1
+        return new_node
+
+    def contains(self, key):
+        """Check if a key exists in the skip list."""
+        current = self._predecessor(key)._forward[0]
         return current is not None and current._key == key
 
+    def get(self, key, default=None):
+        """Return the value stored under key, or default if the key is absent."""
+        current = self._predecessor(key)._forward[0]
+        if current is not None and current._key == key:
+            return current._value
+        return default
+
     def delete(self, key):
         """Delete a key from the skip list."""
-        # Array to track update positions
-        update = [None] * (self.max_level + 1)
-        current = self.head
-
-        # Search for deletion point
-        for i in range(self.level, -1, -1):
-            while current._forward[i] is not None and current._forward[i]._key < key:
-                current = current._forward[i]
-            update[i] = current
-
-        current = current._forward[0]
+        update, _ = self._search_path(key)
+        current = update[0]._forward[0]
 
         # If key exists, delete it
         if current is not None and current._key == key:
-            # Update forward pointers
+            # Update forward pointers, merging the widths of the unlinked node
             for i in range(self.level + 1):
-                if update[i]._forward[i] != current:
-                    break
-                update[i]._forward[i] = current._forward[i]
+                if update[i]._forward[i] is current:
+                    update[i]._width[i] += current._width[i] - 1
+                    update[i]._forward[i] = current._forward[i]
+                else:
+                    update[i]._width[i] -= 1
 
             # Update level if necessary
             while self.level > 0 and self.head._forward[self.level] is None:
                 self.level -= 1
 
+            self._size -= 1
             return True
         return False
 
+    def range(self, lo=None, hi=None) -> Iterator[tuple]:
+        """
+        Lazily yield (key, value) pairs with lo <= key < hi, in key order.
+
+        Seeks to lo in O(log n), then walks level 0. A bound of None is open.
+        """
+        if lo is None:
+            current = self.head._forward[0]
+        else:
+            current = self._predecessor(lo)._forward[0]
+        while current is not None and (hi is None or current._key < hi):
+            yield current._key, current._value
+            current = current._forward[0]
+
+    def floor(self, key) -> Optional[tuple]:
+        """Return the (key, value) pair with the greatest key <= key, or None."""
+        previous = self._predecessor(key)
+        current = previous._forward[0]
+        if current is not None and current._key == key:
+            return current._key, current._value
+        if previous is self.head:
+            return None
+        return previous._key, previous._value
+
+    def ceiling(self, key) -> Optional[tuple]:
+        """Return the (key, value) pair with the smallest key >= key, or None."""
+        current = self._predecessor(key)._forward[0]
+        if current is None:
+            return None
+        return current._key, current._value
+
+    def rank(self, key) -> int:
+        """Return the number of keys less than key (the index of key if present)."""
+        _, rank = self._search_path(key)
+        return rank[0]
+
+    def select(self, index) -> tuple:
+        """Return the (key, value) pair at a 0-based index in key order."""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("skip list index out of range")
+
+        target = index + 1
+        current = self.head
+        position = 0
+        for i in range(self.level, -1, -1):
+            while (
+                current._forward[i] is not None
+                and position + current._width[i] <= target
+            ):
+                position += current._width[i]
+                current = current._forward[i]
+        return current._key, current._value
+
     def generate_random_level(self):
         """Generate a random level for a node using geometric distribution."""
         level = 0
@@ -0,0 +1,244 @@
+import random
+import sys
+import threading
+import time
+
+import pytest
+
+from .concurrent_skip_list import ConcurrentSkipList
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    # switch threads far more often than the default 5ms to shake out races
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _run_threads(targets):
+    errors = []
+
+    def wrap(target):
+        def run():
+            try:
+                target()
+            except BaseException as e:  # surfaced in the main thread below
+                errors.append(e)
+
+        return run
+
+    threads = [threading.Thread(target=wrap(target)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def _run_with_readers(writers, reader, num_readers):
+    """Run the writer threads to completion while reader threads loop alongside."""
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        try:
+            while not stop.is_set():
+                reader()
+        except BaseException as e:  # surfaced in the main thread below
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(num_readers)]
+    for thread in readers:
+        thread.start()
+    try:
+        _run_threads(writers)
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+
+def _assert_well_formed(sl):
+    """Every level is sorted, holds no deleted nodes and is a subset of level 0."""
+    bottom = sl.to_list()
+    assert bottom == sorted(set(bottom))
+    assert len(sl) == len(bottom)
+    for level in range(sl.max_level + 1):
+        keys = []
+        node = sl.head._forward[level]
+        while node is not None:
+            assert not node._marked and node._fully_linked
+            keys.append(node._key)
+            node = node._forward[level]
+        assert keys == sorted(keys)
+        assert set(keys) <= set(bottom)
+
+
+def test_single_threaded_behaves_like_skip_list():
+    sl = ConcurrentSkipList()
+    for key in [5, 1, 9, 3]:
+        sl.insert(key, str(key))
+    sl.insert(3, "three")
+
+    assert sl.to_list() == [1, 3, 5, 9]
+    assert sl.contains(9) and not sl.contains(4)
+    assert sl.get(3) == "three"
+    assert sl.get(4, "missing") == "missing"
+    assert list(sl.range(2, 9)) == [(3, "three"), (5, "5")]
+    assert sl.delete(5) is True
+    assert sl.delete(5) is False
+    assert sl.to_list() == [1, 3, 9]
+    assert len(sl) == 3
+
+
+def test_concurrent_writers_on_disjoint_keys_with_readers():
+    sl = ConcurrentSkipList(max_level=8)
+    num_writers = 8
+
+    def writer(offset):
+        def run():
+            keys = list(range(offset, 4_000, num_writers))
+            random.Random(offset).shuffle(keys)
+            for key in keys:
+                sl.insert(key, -key)
+            for key in keys[::2]:
+                assert sl.delete(key)
+
+        return run
+
+    def reader():
+        seen = [key for key, _ in sl.range()]
+        assert seen == sorted(seen)
+        for key in range(0, 4_000, 97):
+            value = sl.get(key)
+            assert value is None or value == -key
+
+    _run_with_readers([writer(offset) for offset in range(num_writers)], reader, 4)
+
+    expected = set()
+    for offset in range(num_writers):
+        keys = list(range(offset, 4_000, num_writers))
+        random.Random(offset).shuffle(keys)
+        expected |= set(keys[1::2])
+    assert sl.to_list() == sorted(expected)
+    _assert_well_formed(sl)
+
+
+def test_contended_inserts_and_deletes_each_take_effect_once():
+    sl = ConcurrentSkipList(max_level=8)
+    keys = list(range(1_000))
+    deleted = []
+
+    def inserter():
+        for key in keys:
+            sl.insert(key)
+
+    def deleter():
+        deleted.append(sum(sl.delete(key) for key in keys[::2]))
+
+    _run_threads([inserter] * 6)
+    assert sl.to_list() == keys
+    _assert_well_formed(sl)
+
+    _run_threads([deleter] * 6)
+    assert sum(deleted) == len(keys[::2])
+    assert sl.to_list() == keys[1::2]
+    _assert_well_formed(sl)
+
+
+def test_racing_inserts_deletes_and_reads_on_the_same_keys():
+    # few keys, so inserts keep landing on nodes that are being deleted
+    sl = ConcurrentSkipList(max_level=4)
+    keys = list(range(16))
+
+    def inserter(seed):
+        def run():
+            rng = random.Random(seed)
+            for _ in range(3_000):
+                key = rng.choice(keys)
+                sl.insert(key, -key)
+
+        return run
+
+    def deleter(seed):
+        def run():
+            rng = random.Random(seed)
+            for _ in range(3_000):
+                sl.delete(rng.choice(keys))
+
+        return run
+
+    def reader():
+        seen = [key for key, _ in sl.range()]
+        assert seen == sorted(set(seen))
+        for key in keys[::7]:
+            value = sl.get(key)
+            assert value is None or value == -key
+
+    writers = [inserter(seed) for seed in range(4)]
+    writers += [deleter(seed) for seed in range(4, 8)]
+    _run_with_readers(writers, reader, 3)
+
+    _assert_well_formed(sl)
+    remaining = sl.to_list()
+    assert set(remaining) <= set(keys)
+    assert len(sl) == len(remaining)
+    assert all(sl.get(key) == -key for key in remaining)
+    assert sum(sl.delete(key) for key in keys) == len(remaining)
+    assert len(sl) == 0 and sl.to_list() == []
+
+
+class _GatedLock:
+    """A lock whose acquire waits for a gate to open, to hold a writer mid-operation."""
+
+    def __init__(self, gate):
+        self._gate = gate
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        self._gate.wait()
+        return self._lock.acquire()
+
+    def release(self):
+        self._lock.release()
+
+
+def test_insert_retries_while_a_delete_of_the_same_key_is_unlinking():
+    sl = ConcurrentSkipList(max_level=0)
+    sl.insert(1, "one")
+    sl.insert(2, "old")
+    node = sl.head._forward[0]
+    victim = node._forward[0]
+
+    # delete(2) marks its node, then blocks taking the lock of its predecessor
+    gate = threading.Event()
+    node._lock = _GatedLock(gate)
+    saw_marked = threading.Event()
+    find = sl._find
+
+    def watching_find(key, preds, succs):
+        found = find(key, preds, succs)
+        if found != -1 and succs[found]._marked:
+            saw_marked.set()
+        return found
+
+    sl._find = watching_find
+
+    def insert_once_marked():
+        while not victim._marked:
+            time.sleep(0)
+        sl.insert(2, "new")
+
+    def release_gate():
+        assert saw_marked.wait(5)  # insert(2) met the marked node and is retrying
+        gate.set()
+
+    _run_threads([lambda: sl.delete(2), insert_once_marked, release_gate])
+    assert sl.get(2) == "new"
+    assert sl.to_list() == [1, 2]
+    _assert_well_formed(sl)
@@ -1,6 +1,7 @@
-from .skip_list import SkipList
+from .skip_list import SkipList, SkipListNode
 import time
 import random
+import pytest
 
 
 def test_can_create_skip_list():
@@ -238,3 +239,147 @@ def test_structure_height_increases_with_more_items():
 
     final_info = sl.get_structure_info()
     assert final_info["current_height"] > 0, "Final structure should have height > 0"
+
+
+def test_nodes_have_no_instance_dict():
+    sl = SkipList()
+    sl.insert(1)
+    assert not hasattr(sl.head._forward[0], "__dict__")
+    assert "__dict__" not in SkipListNode.__slots__
+
+
+def test_stores_values_and_replaces_them_on_reinsert():
+    sl = SkipList()
+    sl.insert("a", 1)
+    sl.insert("b", 2)
+    sl.insert("a", 3)
+
+    assert sl.get("a") == 3
+    assert sl.get("b") == 2
+    assert sl.get("missing", "default") == "default"
+    assert len(sl) == 2
+
+
+def test_range_yields_pairs_lazily_between_bounds():
+    sl = SkipList()
+    for key in [5, 1, 9, 3, 7]:
+        sl.insert(key, str(key))
+
+    assert list(sl.range(3, 9)) == [(3, "3"), (5, "5"), (7, "7")]
+    assert list(sl.range(4)) == [(5, "5"), (7, "7"), (9, "9")]
+    assert list(sl.range(hi=2)) == [(1, "1")]
+    assert list(sl.range(10, 20)) == []
+
+    pairs = sl.range()
+    assert next(pairs) == (1, "1")
+
+
+def test_floor_and_ceiling():
+    sl = SkipList()
+    for key in [10, 20, 30]:
+        sl.insert(key, key * 2)
+
+    assert sl.floor(20) == (20, 40)
+    assert sl.floor(25) == (20, 40)
+    assert sl.floor(5) is None
+    assert sl.ceiling(20) == (20, 40)
+    assert sl.ceiling(25) == (30, 60)
+    assert sl.ceiling(35) is None
+
+
+def test_rank_and_select_match_sorted_list_through_updates():
+    random.seed(7)
+    sl = SkipList(max_level=8)
+    expected = set()
+    for _ in range(2_000):
+        key = random.randrange(500)
+        if random.random() < 0.3:
+            assert sl.delete(key) == (key in expected)
+            expected.discard(key)
+        else:
+            sl.insert(key, -key)
+            expected.add(key)
+
+    ordered = sorted(expected)
+    assert len(sl) == len(ordered)
+    for index, key in enumerate(ordered):
+        assert sl.select(index) == (key, -key)
+        assert sl.rank(key) == index
+    assert sl.rank(-1) == 0
+    assert sl.rank(1_000) == len(ordered)
+    assert sl.select(-1) == (ordered[-1], -ordered[-1])
+
+
+def test_select_out_of_range_raises_index_error():
+    sl = SkipList()
+    sl.insert(1)
+    with pytest.raises(IndexError):
+        sl.select(1)
+
+
+def _check_positions(sl, expected):
+    assert sl.to_list() == expected
+    assert len(sl) == len(expected)
+    for index, key in enumerate(expected):
+        assert sl.contains(key)
+        assert sl.rank(key) == index
+        assert sl.select(index)[0] == key
+
+
+@pytest.mark.parametrize("deterministic", [False, True])
+def test_from_sorted_builds_a_valid_skip_list(deterministic):
+    random.seed(3)
+    keys = list(range(0, 2_000, 3))
+    sl = SkipList.from_sorted(keys, [k * 2 for k in keys], deterministic=deterministic)
+
+    _check_positions(sl, keys)
+    assert sl.get(9) == 18
+    assert list(sl.range(10, 20)) == [(12, 24), (15, 30), (18, 36)]
+
+    # the result is an ordinary skip list that keeps working after updates
+    sl.insert(1)
+    sl.delete(3)
+    _check_positions(sl, sorted(set(keys) - {3} | {1}))
+
+
+def test_from_sorted_deterministic_levels_halve():
+    sl = SkipList.from_sorted(range(1, 1_025), max_level=20, deterministic=True)
+    assert sl.level == 10
+    levels = {}
+    current = sl.head._forward[0]
+    while current is not None:
+        level = len(current._forward) - 1
+        levels[level] = levels.get(level, 0) + 1
+        current = current._forward[0]
+    assert [levels[level] for level in range(4)] == [512, 256, 128, 64]
+
+
+def test_from_sorted_rejects_unsorted_keys_and_keeps_last_duplicate():
+    with pytest.raises(ValueError, match="ascending"):
+        SkipList.from_sorted([1, 3, 2])
+    sl = SkipList.from_sorted([1, 1, 2], ["a", "b", "c"])
+    assert sl.to_list() == [1, 2]
+    assert sl.get(1) == "b"
+
+    assert len(SkipList.from_sorted([])) == 0
+
+
+def test_insert_many_matches_repeated_insert():
+    random.seed(5)
+    sl = SkipList(max_level=10)
+    for key in random.sample(range(5_000), 500):
+        sl.insert(key)
+
+    batch = [random.randrange(6_000) for _ in range(2_000)]
+    sl.insert_many(batch, [-key for key in batch])
+
+    expected = sorted(set(sl.to_list()) | set(batch))
+    _check_positions(sl, expected)
+    assert all(sl.get(key) == -key for key in batch)
+
+
+def test_insert_many_last_value_wins_for_repeated_keys():
+    sl = SkipList()
+    sl.insert_many(["b", "a", "b"], [1, 2, 3])
+    assert sl.to_list() == ["a", "b"]
+    assert sl.get("b") == 3